@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'equipment.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -66,12 +67,91 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite suits single-node installs; set DB_ENGINE=postgresql when several
+# operators upload concurrently, since SQLite serializes all writes.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'chemical_visualizer'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Keep connections open between requests, checked before reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked"
+                'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', 30)),
+            },
+            # Tests use a file rather than memory so concurrent uploads hit
+            # SQLite's real locking and WAL journal
+            'TEST': {
+                'NAME': os.environ.get('SQLITE_TEST_PATH', BASE_DIR / 'test_db.sqlite3'),
+            },
+        }
+    }
+
+# Pragmas applied to every SQLite connection (see equipment.signals).
+# WAL lets readers proceed while an upload is being written; NORMAL
+# synchronous is durable across application crashes in WAL mode.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+
+# Cache
+# locmem is per-process; use the file or redis backend when running
+# several gunicorn workers so invalidation is shared between them.
+# Token auth caching (TOKEN_AUTH_CACHE_TIMEOUT) and cross-process job
+# progress on SQLite only take effect with a shared backend, so with the
+# default every request still looks its token up in the database.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'chemical-equipment-visualizer',
+        }
+    }
+
+# Seconds a cached summary/history response is kept for a user
+USER_DATA_CACHE_TIMEOUT = int(os.environ.get('USER_DATA_CACHE_TIMEOUT', 300))
+
+# Seconds a token -> user lookup is cached by CachedTokenAuthentication (0 disables).
+# Only used with the file or redis cache, so logout reaches every process.
+TOKEN_AUTH_CACHE_TIMEOUT = int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 300))
+
+# Per-endpoint request metrics (Server-Timing header and /api/metrics/).
+# /api/metrics/ is served to staff users and to scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>"; it answers 404 to anyone else.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -100,13 +180,20 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Media files (spooled CSV files for background upload jobs)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', str(BASE_DIR / 'media'))
+
+# Rendered PDF reports are cached here, keyed by upload and template version
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(MEDIA_ROOT, 'reports'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'equipment.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -114,6 +201,16 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson-backed JSON when installed, stdlib json otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'equipment.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'equipment.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # CORS settings
@@ -125,4 +222,29 @@ CORS_ALLOWED_ORIGINS = os.environ.get(
 CORS_ALLOW_CREDENTIALS = True
 
 # File upload settings
-MAX_UPLOAD_SIZE = 5242880  # 5MB in bytes
+# CSV uploads are streamed from disk in chunks, so the cap only guards
+# against runaway files. Set to 0 to disable it.
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 1073741824))  # 1GB in bytes
+
+# CSV ingestion settings
+CSV_INGEST_BATCH_SIZE = int(os.environ.get('CSV_INGEST_BATCH_SIZE', 2000))
+CSV_INGEST_CHUNK_SIZE = int(os.environ.get('CSV_INGEST_CHUNK_SIZE', 50000))
+# Dotted path to an equipment.ingest_backends.IngestBackend; empty picks
+# COPY on PostgreSQL and batched bulk_create on other databases
+CSV_INGEST_BACKEND = os.environ.get('CSV_INGEST_BACKEND', '')
+# Directory for cProfile dumps of each CSV ingest (empty disables profiling)
+INGEST_PROFILE_DIR = os.environ.get('INGEST_PROFILE_DIR', '')
+
+# Uploads kept per user (UserProfile.upload_retention overrides it; 0 keeps all).
+# Set PURGE_UPLOADS_ON_INGEST=False to purge only via `manage.py purge_uploads`.
+UPLOAD_RETENTION = int(os.environ.get('UPLOAD_RETENTION', 5))
+PURGE_UPLOADS_ON_INGEST = os.environ.get('PURGE_UPLOADS_ON_INGEST', 'True') == 'True'
+
+# Background upload jobs
+# ThreadPoolJobExecutor runs jobs inside the web process; QueuedJobExecutor
+# leaves them for `python manage.py run_upload_worker`.
+UPLOAD_JOB_EXECUTOR = os.environ.get('UPLOAD_JOB_EXECUTOR', 'equipment.jobs.ThreadPoolJobExecutor')
+UPLOAD_JOB_WORKERS = int(os.environ.get('UPLOAD_JOB_WORKERS', 2))
+# Seconds without a progress heartbeat after which run_upload_worker
+# returns a running job to the queue (its process is assumed dead)
+UPLOAD_JOB_STALE_TIMEOUT = int(os.environ.get('UPLOAD_JOB_STALE_TIMEOUT', 600))
@@ -7,7 +7,8 @@ from rest_framework import routers
 from equipment.views import (
     EquipmentViewSet, UploadCSVView, DataSummaryView, 
     HistoryListView, GeneratePDFView, UserRegisterView, 
-    UserLoginView, UserLogoutView
+    UserLoginView, UserLogoutView, UploadJobCreateView, UploadJobDetailView,
+    UploadExportView, MetricsView
 )
 
 router = routers.DefaultRouter()
@@ -20,7 +21,11 @@ urlpatterns = [
     path('api/auth/login/', UserLoginView.as_view(), name='login'),
     path('api/auth/logout/', UserLogoutView.as_view(), name='logout'),
     path('api/upload-csv/', UploadCSVView.as_view(), name='upload-csv'),
+    path('api/upload-jobs/', UploadJobCreateView.as_view(), name='upload-job-create'),
+    path('api/upload-jobs/<int:pk>/', UploadJobDetailView.as_view(), name='upload-job-detail'),
     path('api/summary/', DataSummaryView.as_view(), name='summary'),
     path('api/history/', HistoryListView.as_view(), name='history'),
+    path('api/uploads/<int:upload_id>/export', UploadExportView.as_view(), name='upload-export'),
     path('api/generate-pdf/', GeneratePDFView.as_view(), name='generate-pdf'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
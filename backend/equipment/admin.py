@@ -21,6 +21,6 @@ class DataUploadAdmin(admin.ModelAdmin):
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'created_at')
+    list_display = ('user', 'upload_retention', 'created_at')
     list_filter = ('created_at',)
     ordering = ('-created_at',)
@@ -0,0 +1,50 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+
+
+DEFAULT_TIMEOUT = 300
+
+
+def _token_key(key):
+    # Hash the token so raw credentials never appear in cache keys
+    return f'equipment:auth-token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def _cache_is_shared():
+    # A locmem entry dropped on logout survives in every other worker process
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def invalidate_cached_token(key):
+    """Drop the cached lookup for a token key"""
+    cache.delete(_token_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that caches token -> (user, token) lookups.
+
+    Saves the Token/User query on every authenticated request. Entries
+    expire after TOKEN_AUTH_CACHE_TIMEOUT seconds (0 disables caching) and
+    are dropped on logout, token deletion and user changes. Caching is
+    skipped with a process-local cache backend, where that invalidation
+    would not reach other processes.
+    """
+
+    def authenticate_credentials(self, key):
+        timeout = getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        if not timeout or not _cache_is_shared():
+            return super().authenticate_credentials(key)
+
+        cache_key = _token_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            # Failed lookups raise and are never cached
+            credentials = super().authenticate_credentials(key)
+            cache.set(cache_key, credentials, timeout)
+        return credentials
@@ -0,0 +1,72 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+DEFAULT_TIMEOUT = 300
+
+
+def _version_key(user_id):
+    return f'equipment:data-version:{user_id}'
+
+
+def get_data_version(user_id):
+    """
+    Return the current data version for a user.
+
+    A missing version (first use or evicted) is seeded with the current
+    time so it can never collide with a version used by older entries.
+    """
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), time.time_ns(), None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached response for a user"""
+    cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def cached_user_data(request, prefix, build):
+    """
+    Return response data for the current user from the cache, building it
+    on a miss. Keys include the user's data version and the full request
+    path, so paginated and filtered variants are cached separately.
+    """
+    user_id = request.user.pk
+    key = f'equipment:{prefix}:{user_id}:{get_data_version(user_id)}:{request.get_full_path()}'
+
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        timeout = getattr(settings, 'USER_DATA_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        cache.set(key, data, timeout)
+    return data
+
+
+def get_last_modified(user_id):
+    """
+    Return when the user's data last changed.
+
+    Versions are set from the clock on every change (uploads, retention,
+    equipment edits) and re-seeded with the current time when evicted, so
+    the version time never predates the latest change.
+    """
+    return datetime.fromtimestamp(get_data_version(user_id) / 1e9, tz=dt_timezone.utc)
+
+
+def user_data_etag(request, *args, **kwargs):
+    """Strong ETag for a user's data at its current version and request path"""
+    user_id = request.user.pk
+    raw = f'{user_id}:{get_data_version(user_id)}:{request.get_full_path()}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def user_data_last_modified(request, *args, **kwargs):
+    """Last-Modified value for a user's data (time of its latest change)"""
+    return get_last_modified(request.user.pk)
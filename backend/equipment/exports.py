@@ -0,0 +1,138 @@
+import csv
+import io
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+EXPORT_COLUMNS = ('id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature')
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+# Formats that need pyarrow installed
+ARROW_FORMATS = ('parquet', 'arrow')
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+class ExportError(Exception):
+    """Raised when an export cannot be produced"""
+
+
+def export_rows(upload, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield lists of equipment value tuples for an upload, straight from a DB cursor"""
+    rows = upload.equipment_items.order_by('id').values_list(*EXPORT_COLUMNS).iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def stream_export(upload, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Return a byte-chunk generator for an upload in the requested format"""
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f'format must be one of: {", ".join(EXPORT_FORMATS)}')
+    if fmt in ARROW_FORMATS and pa is None:
+        raise ExportError(f'{fmt} export requires the pyarrow package')
+
+    batches = export_rows(upload, batch_size)
+    if fmt == 'csv':
+        return _stream_csv(batches)
+    if fmt == 'arrow':
+        return _stream_arrow(batches)
+    return _stream_parquet(batches)
+
+
+def _stream_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _arrow_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.string()),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+
+def _record_batch(batch, schema):
+    columns = list(zip(*batch))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+class _Drain:
+    """Write-only sink whose buffered bytes are handed out as they are written"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        """Return the bytes written since the last call (empty list if none)"""
+        if not self.chunks:
+            return []
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return [data]
+
+
+def _stream_arrow(batches):
+    schema = _arrow_schema()
+    drain = _Drain()
+    with pa.ipc.new_stream(pa.PythonFile(drain, mode='w'), schema) as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(batch, schema))
+            yield from drain.take()
+    yield from drain.take()
+
+
+def _stream_parquet(batches):
+    schema = _arrow_schema()
+    drain = _Drain()
+    # One row group per batch, so each group is flushed as soon as it is written
+    with pq.ParquetWriter(pa.PythonFile(drain, mode='w'), schema) as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(batch, schema))
+            yield from drain.take()
+    yield from drain.take()
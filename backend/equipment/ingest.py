@@ -0,0 +1,261 @@
+from contextlib import contextmanager
+import cProfile
+from itertools import islice
+import os
+import time
+
+from django.conf import settings
+from django.db import transaction
+import pandas as pd
+
+from equipment.ingest_backends import get_ingest_backend
+from equipment.models import DataUpload
+from equipment.retention import purge_old_uploads
+from equipment.stats import UploadStatistics
+
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# Map common type names
+TYPE_MAPPING = {
+    'pump': 'pump', 'compressor': 'compressor', 'reactor': 'reactor',
+    'heat exchanger': 'heat_exchanger', 'separator': 'separator',
+    'mixer': 'mixer', 'boiler': 'boiler', 'filter': 'filter'
+}
+
+NUMERIC_COLUMNS = ['flowrate', 'pressure', 'temperature']
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+class IngestError(Exception):
+    """Raised when an uploaded CSV cannot be ingested"""
+
+
+class IngestReport:
+    """
+    Per-stage timings and row counts for one run of the ingest pipeline.
+
+    Stages: parse (decoding and pd.read_csv, which pandas does together),
+    validate, clean, aggregate (running statistics), insert, finalize
+    (saving the upload's statistics) and purge (retention).
+    """
+
+    def __init__(self, source_bytes=None):
+        self.source_bytes = source_bytes
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block, accumulating into the named stage; yields the stage dict"""
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'rows': 0})
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] += time.perf_counter() - start
+
+    def as_dict(self):
+        stages = {
+            name: {**entry, 'seconds': round(entry['seconds'], 6)}
+            for name, entry in self.stages.items()
+        }
+        if self.source_bytes is not None and 'parse' in stages:
+            stages['parse']['bytes'] = self.source_bytes
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'bytes': self.source_bytes,
+            'stages': stages,
+        }
+
+
+def get_chunk_size():
+    """Return the configured number of CSV rows parsed per chunk"""
+    return getattr(settings, 'CSV_INGEST_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def open_upload(csv_file):
+    """
+    Return a readable source for an uploaded CSV file.
+
+    Large uploads are spooled to disk by Django's TemporaryFileUploadHandler,
+    so they are read straight from the temporary file path.
+    """
+    if hasattr(csv_file, 'temporary_file_path'):
+        return csv_file.temporary_file_path()
+    csv_file.seek(0)
+    return csv_file
+
+
+def source_size(source):
+    """Return the size in bytes of a CSV source (path or file object), if known"""
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        return os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return getattr(source, 'size', None)
+
+
+def read_chunks(source, chunk_size=None):
+    """Yield raw DataFrames of at most chunk_size rows from a CSV source"""
+    chunk_size = chunk_size or get_chunk_size()
+    with pd.read_csv(source, chunksize=chunk_size, encoding='utf-8') as reader:
+        yield from reader
+
+
+def validate_columns(columns):
+    """Ensure all required CSV headers are present"""
+    if not all(col in columns for col in REQUIRED_COLUMNS):
+        raise IngestError(f'CSV must contain columns: {", ".join(REQUIRED_COLUMNS)}')
+
+
+def clean_frame(df):
+    """
+    Normalize a raw CSV DataFrame into equipment columns.
+
+    Type mapping, stripping and float coercion are done as whole-column
+    operations. Rows whose numeric values cannot be parsed are dropped.
+    """
+    df = df.rename(columns=lambda col: col.strip().lower().replace(' ', '_'))
+
+    cleaned = pd.DataFrame({
+        'equipment_name': df['equipment_name'].astype(str).str.strip(),
+        'equipment_type': (
+            df['type'].astype(str).str.strip().str.lower()
+            .map(TYPE_MAPPING).fillna('other')
+        ),
+    })
+    for col in NUMERIC_COLUMNS:
+        cleaned[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return cleaned.dropna(subset=NUMERIC_COLUMNS)
+
+
+def ingest_chunks(user, filename, chunks, batch_size=None, progress=None, report=None):
+    """
+    Create a DataUpload and stream equipment rows into it chunk by chunk.
+
+    Each chunk is validated, cleaned and inserted before the next one is
+    parsed, so memory use is bounded by the chunk size rather than the
+    file size. Rows are written by the configured ingest backend (COPY on
+    PostgreSQL, bulk_create elsewhere). Summary statistics are accumulated
+    as chunks are parsed and saved in a single write. Everything runs in
+    one transaction.
+
+    If given, progress(rows_parsed, rows_inserted) is called after each chunk
+    and stage timings are recorded on report (an IngestReport).
+    """
+    stats = UploadStatistics(NUMERIC_COLUMNS)
+    backend = get_ingest_backend(batch_size)
+    report = report or IngestReport()
+    chunks = iter(chunks)
+
+    with transaction.atomic():
+        upload = DataUpload.objects.create(user=user, filename=filename)
+        total_records = 0
+        inserted = 0
+
+        while True:
+            with report.stage('parse') as stage:
+                df = next(chunks, None)
+                if df is not None:
+                    stage['rows'] += len(df)
+            if df is None:
+                break
+
+            with report.stage('validate') as stage:
+                validate_columns(df.columns)
+                stage['rows'] += len(df)
+            total_records += len(df)
+
+            with report.stage('clean') as stage:
+                cleaned = clean_frame(df)
+                stage['rows'] += len(cleaned)
+
+            with report.stage('aggregate') as stage:
+                stats.update(cleaned)
+                stage['rows'] += len(cleaned)
+
+            with report.stage('insert') as stage:
+                written = backend.write(upload, cleaned)
+                stage['rows'] += written
+            inserted += written
+
+            if progress:
+                progress(total_records, inserted)
+
+        with report.stage('finalize'):
+            upload.total_records = total_records
+            upload.save(update_fields=['total_records'] + stats.apply(upload))
+
+    return upload
+
+
+def process_csv(user, source, filename, chunk_size=None, batch_size=None, progress=None):
+    """
+    Run the full upload pipeline for a CSV source (path or file object):
+    streaming ingestion followed, in the same transaction, by the
+    retention purge unless PURGE_UPLOADS_ON_INGEST is off.
+
+    The stage timing report is stored on the upload's ingest_report. If
+    INGEST_PROFILE_DIR is set, the run is also profiled with cProfile and
+    the stats are dumped there for inspection with pstats or snakeviz.
+    """
+    report = IngestReport(source_size(source))
+    profile_dir = getattr(settings, 'INGEST_PROFILE_DIR', '')
+    profiler = cProfile.Profile() if profile_dir else None
+
+    if profiler:
+        profiler.enable()
+    try:
+        chunks = read_chunks(source, chunk_size)
+        with transaction.atomic():
+            upload = ingest_chunks(user, filename, chunks, batch_size, progress, report)
+            if getattr(settings, 'PURGE_UPLOADS_ON_INGEST', True):
+                with report.stage('purge') as stage:
+                    stage['rows'] += len(purge_old_uploads(user))
+
+            upload.ingest_report = report.as_dict()
+            if profiler:
+                upload.ingest_report['profile'] = dump_profile(profiler, profile_dir, upload)
+            upload.save(update_fields=['ingest_report'])
+    finally:
+        if profiler:
+            profiler.disable()
+
+    return upload
+
+
+def dump_profile(profiler, profile_dir, upload):
+    """Stop profiler and write its stats for an upload; return the file path"""
+    profiler.disable()
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f'ingest_{upload.pk}_{int(time.time())}.prof')
+    profiler.dump_stats(path)
+    return path
+
+
+def ingest_csv(user, csv_file, chunk_size=None, batch_size=None):
+    """Process an uploaded CSV file without loading it into memory at once"""
+    return process_csv(user, open_upload(csv_file), csv_file.name, chunk_size, batch_size)
+
+
+def refresh_upload_statistics(upload, chunk_size=None):
+    """
+    Recompute an upload's stored statistics and type distribution from its
+    equipment rows, reading them from the database chunk by chunk.
+    """
+    columns = ['equipment_type'] + NUMERIC_COLUMNS
+    chunk_size = chunk_size or get_chunk_size()
+    stats = UploadStatistics(NUMERIC_COLUMNS)
+
+    rows = upload.equipment_items.order_by().values_list(*columns).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        stats.update(pd.DataFrame(chunk, columns=columns))
+
+    upload.save(update_fields=stats.apply(upload))
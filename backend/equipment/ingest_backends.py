@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from equipment.models import Equipment
+
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Cleaned DataFrame columns, in the order they are written
+EQUIPMENT_COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+class IngestBackend:
+    """
+    Interface for writing cleaned equipment rows to the database.
+
+    The ingest pipeline validates and cleans each CSV chunk, then hands the
+    cleaned DataFrame to write(), which returns the number of rows stored.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'CSV_INGEST_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    def write(self, upload, cleaned):
+        raise NotImplementedError
+
+
+class BulkCreateIngestBackend(IngestBackend):
+    """Write rows with batched bulk_create (works on every database)"""
+
+    def write(self, upload, cleaned):
+        objs = [
+            Equipment(
+                upload=upload,
+                equipment_name=row.equipment_name,
+                equipment_type=row.equipment_type,
+                flowrate=row.flowrate,
+                pressure=row.pressure,
+                temperature=row.temperature,
+            )
+            for row in cleaned.itertuples(index=False)
+        ]
+        Equipment.objects.bulk_create(objs, batch_size=self.batch_size)
+        return len(objs)
+
+
+class PostgresCopyIngestBackend(IngestBackend):
+    """
+    Stream rows into the equipment table with COPY FROM STDIN (PostgreSQL only).
+
+    Each chunk is rendered to CSV by pandas and sent in batch_size-row
+    pieces, bypassing model instances and INSERT statements entirely.
+    Works with both psycopg 3 and psycopg2.
+    """
+
+    def write(self, upload, cleaned):
+        if not len(cleaned):
+            return 0
+
+        frame = cleaned[EQUIPMENT_COLUMNS].assign(upload_id=upload.pk, created_at=timezone.now().isoformat())
+        columns = EQUIPMENT_COLUMNS + ['upload_id', 'created_at']
+
+        quote = connection.ops.quote_name
+        db_columns = [quote(Equipment._meta.get_field(name).column) for name in columns]
+        # FORCE_NOT_NULL keeps empty names as '' rather than NULL
+        sql = (
+            f'COPY {quote(Equipment._meta.db_table)} ({", ".join(db_columns)}) FROM STDIN '
+            f'WITH (FORMAT csv, FORCE_NOT_NULL ({db_columns[0]}, {db_columns[1]}))'
+        )
+        pieces = (
+            frame.iloc[start:start + self.batch_size].to_csv(header=False, index=False)
+            for start in range(0, len(frame), self.batch_size)
+        )
+
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy'):
+                with raw_cursor.copy(sql) as copy:
+                    for piece in pieces:
+                        copy.write(piece)
+            else:
+                raw_cursor.copy_expert(sql, _ChunkReader(pieces))
+
+        return len(frame)
+
+
+class _ChunkReader:
+    """Minimal file-like reader over an iterator of strings, for psycopg2 copy_expert()"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def read(self, size=-1):
+        return next(self._chunks, '')
+
+
+@lru_cache(maxsize=None)
+def get_ingest_backend_class():
+    """
+    Return the backend class configured by CSV_INGEST_BACKEND.
+
+    When unset, COPY is used on PostgreSQL and bulk_create everywhere else.
+    """
+    path = getattr(settings, 'CSV_INGEST_BACKEND', '')
+    if path:
+        return import_string(path)
+    if connection.vendor == 'postgresql':
+        return PostgresCopyIngestBackend
+    return BulkCreateIngestBackend
+
+
+def get_ingest_backend(batch_size=None):
+    return get_ingest_backend_class()(batch_size)
@@ -0,0 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from equipment.ingest import IngestError, process_csv
+from equipment.models import UploadJob
+from equipment.reports import render_report_in_background
+
+
+DEFAULT_EXECUTOR = 'equipment.jobs.ThreadPoolJobExecutor'
+DEFAULT_WORKERS = 2
+DEFAULT_STALE_TIMEOUT = 600
+
+
+class UploadJobExecutor:
+    """
+    Interface for running upload jobs outside the HTTP request.
+
+    Implementations only decide where run_upload_job(job_id) is called;
+    the job row and spooled file carry everything needed to process it.
+    """
+
+    def submit(self, job_id):
+        raise NotImplementedError
+
+
+class ThreadPoolJobExecutor(UploadJobExecutor):
+    """Run upload jobs in an in-process thread pool"""
+
+    _pool = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls):
+        with cls._lock:
+            if cls._pool is None:
+                workers = getattr(settings, 'UPLOAD_JOB_WORKERS', DEFAULT_WORKERS)
+                cls._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload-job')
+            return cls._pool
+
+    def submit(self, job_id):
+        run_in_background(run_upload_job, job_id)
+
+
+class QueuedJobExecutor(UploadJobExecutor):
+    """Leave jobs pending for a separate `manage.py run_upload_worker` process"""
+
+    def submit(self, job_id):
+        pass
+
+
+def run_in_background(func, *args):
+    """Run func(*args) on the shared thread pool once the current transaction commits"""
+    transaction.on_commit(lambda: ThreadPoolJobExecutor.get_pool().submit(_run_in_thread, func, *args))
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    """Return the executor configured by UPLOAD_JOB_EXECUTOR"""
+    return import_string(getattr(settings, 'UPLOAD_JOB_EXECUTOR', DEFAULT_EXECUTOR))()
+
+
+def _progress_key(job_id):
+    return f'equipment:upload-job-progress:{job_id}'
+
+
+def _heartbeat_key(job_id):
+    return f'equipment:upload-job-heartbeat:{job_id}'
+
+
+def get_job_progress(job_id):
+    """
+    Return live progress for a running job kept in the cache, or None.
+
+    Only used on SQLite; other databases publish progress on the job row.
+    """
+    return cache.get(_progress_key(job_id))
+
+
+class JobProgress:
+    """
+    Publishes a running job's progress where every process can read it.
+
+    Rows are inserted inside one transaction, so progress is written to
+    the job row through a second, autocommit connection. SQLite allows a
+    single writer and the ingest transaction holds it, so there progress
+    and the heartbeat go to the cache instead; use a shared cache
+    (CACHE_BACKEND=file or redis) when several processes run jobs.
+    """
+
+    FIELDS = ('bytes_processed', 'rows_parsed', 'rows_inserted', 'rows_rejected')
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.connection = None
+        if connection.vendor != 'sqlite':
+            self.connection = connections.create_connection(DEFAULT_DB_ALIAS)
+
+    def publish(self, **progress):
+        if self.connection is None:
+            cache.set_many({
+                _progress_key(self.job_id): progress,
+                _heartbeat_key(self.job_id): timezone.now(),
+            }, None)
+            return
+
+        ops = self.connection.ops
+        assignments = ', '.join(f'{ops.quote_name(name)} = %s' for name in self.FIELDS + ('heartbeat_at',))
+        sql = (
+            f'UPDATE {ops.quote_name(UploadJob._meta.db_table)} SET {assignments} '
+            f'WHERE {ops.quote_name("id")} = %s'
+        )
+        params = [progress[name] for name in self.FIELDS] + [timezone.now(), self.job_id]
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def close(self):
+        if self.connection is None:
+            cache.delete_many([_progress_key(self.job_id), _heartbeat_key(self.job_id)])
+        else:
+            self.connection.close()
+
+
+def claim_job(job_id):
+    """Atomically move a pending job to running; False if someone else has it"""
+    now = timezone.now()
+    return UploadJob.objects.filter(pk=job_id, status=UploadJob.STATUS_PENDING).update(
+        status=UploadJob.STATUS_RUNNING, started_at=now, heartbeat_at=now
+    ) == 1
+
+
+def reclaim_stale_jobs():
+    """
+    Return running jobs with no heartbeat for UPLOAD_JOB_STALE_TIMEOUT seconds
+    to pending, so a worker picks them up again after the process running
+    them died. The ingest transaction rolled back with that process, and the
+    spooled file is only deleted once a job finishes.
+    """
+    timeout = getattr(settings, 'UPLOAD_JOB_STALE_TIMEOUT', DEFAULT_STALE_TIMEOUT)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    candidates = list(
+        UploadJob.objects.filter(status=UploadJob.STATUS_RUNNING, heartbeat_at__lt=cutoff)
+        .values_list('pk', flat=True)
+    )
+    if not candidates:
+        return 0
+
+    # On SQLite the heartbeat of a job still inserting is only in the cache
+    heartbeats = cache.get_many([_heartbeat_key(job_id) for job_id in candidates])
+    stale = [job_id for job_id in candidates if heartbeats.get(_heartbeat_key(job_id), cutoff) <= cutoff]
+    return UploadJob.objects.filter(
+        pk__in=stale, status=UploadJob.STATUS_RUNNING, heartbeat_at__lt=cutoff
+    ).update(
+        status=UploadJob.STATUS_PENDING, started_at=None, heartbeat_at=None, bytes_processed=0,
+        rows_parsed=0, rows_inserted=0, rows_rejected=0
+    )
+
+
+def run_upload_job(job_id):
+    """Process a pending upload job: ingest, apply retention and record the outcome"""
+    if not claim_job(job_id):
+        return
+
+    job = UploadJob.objects.select_related('user').get(pk=job_id)
+    progress = JobProgress(job.pk)
+
+    try:
+        with job.file.open('rb') as fh:
+            def report(rows_parsed, rows_inserted):
+                progress.publish(
+                    bytes_processed=fh.tell(),
+                    rows_parsed=rows_parsed,
+                    rows_inserted=rows_inserted,
+                    rows_rejected=rows_parsed - rows_inserted,
+                )
+
+            upload = process_csv(job.user, fh, job.filename, progress=report)
+
+        job.upload = upload
+        job.status = UploadJob.STATUS_COMPLETED
+        job.bytes_processed = job.bytes_total
+        job.rows_parsed = upload.total_records
+        job.rows_inserted = upload.equipment_count
+        job.rows_rejected = upload.total_records - upload.equipment_count
+    except IngestError as e:
+        job.status = UploadJob.STATUS_FAILED
+        job.error = str(e)
+    except Exception as e:
+        job.status = UploadJob.STATUS_FAILED
+        job.error = f'Error processing CSV: {str(e)}'
+    finally:
+        job.file.delete(save=False)
+        job.finished_at = timezone.now()
+        job.save()
+        progress.close()
+
+    if job.status == UploadJob.STATUS_COMPLETED:
+        # Already off the request path, so pre-render the report here;
+        # a failure only means it is rendered on first download instead.
+        try:
+            render_report_in_background(job.upload_id)
+        except Exception:
+            pass
+
+    return job
+
+
+def _run_in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        connection.close()
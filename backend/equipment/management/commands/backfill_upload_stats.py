@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from equipment.ingest import refresh_upload_statistics
+from equipment.models import DataUpload
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored statistics and type distribution for existing uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only backfill uploads for this username')
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Number of equipment rows read from the database at a time'
+        )
+
+    def handle(self, *args, **options):
+        uploads = DataUpload.objects.all()
+        if options['user']:
+            uploads = uploads.filter(user__username=options['user'])
+
+        updated = 0
+        for upload in uploads.iterator():
+            refresh_upload_statistics(upload, options['chunk_size'])
+            updated += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled statistics for {updated} upload(s)'))
@@ -0,0 +1,72 @@
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from equipment.models import Equipment, DataUpload
+from equipment.reports import REPORT_MODE_FULL, REPORT_MODES, render_report
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF report rendering against synthetic uploads (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Equipment row counts to benchmark'
+        )
+        parser.add_argument('--mode', choices=REPORT_MODES, default=REPORT_MODE_FULL)
+        parser.add_argument(
+            '--trace-memory', action='store_true',
+            help='Also report peak Python memory (tracemalloc slows rendering down)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>10} {'seconds':>10} {'rows/s':>10} {'size MB':>10} {'peak MB':>10}")
+
+        for count in options['rows']:
+            with transaction.atomic():
+                upload = self._create_upload(count)
+                seconds, size, peak = self._render(upload, options['mode'], options['trace_memory'])
+                transaction.set_rollback(True)
+
+            peak_text = f'{peak / 1e6:10.1f}' if peak is not None else f"{'-':>10}"
+            self.stdout.write(
+                f'{count:>10} {seconds:10.2f} {count / seconds:10.0f} {size / 1e6:10.2f} {peak_text}'
+            )
+
+    def _create_upload(self, count):
+        user = User.objects.create_user(username='report-benchmark')
+        upload = DataUpload.objects.create(user=user, filename='benchmark.csv', total_records=count)
+        Equipment.objects.bulk_create(
+            (
+                Equipment(
+                    upload=upload,
+                    equipment_name=f'Pump-{i}',
+                    equipment_type='pump',
+                    flowrate=100 + i % 50,
+                    pressure=5 + i % 7,
+                    temperature=80 + i % 30,
+                )
+                for i in range(count)
+            ),
+            batch_size=2000
+        )
+        return upload
+
+    def _render(self, upload, mode, trace_memory):
+        peak = None
+        with tempfile.TemporaryFile() as out:
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            render_report(upload, out, mode)
+            seconds = time.perf_counter() - start
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            size = out.tell()
+        return seconds, size, peak
@@ -0,0 +1,86 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from equipment.models import Equipment, DataUpload
+from equipment.serializers import EquipmentSerializer, EquipmentReadSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list serialization: ModelSerializer vs values() read serializer (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Equipment row counts to benchmark'
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'rows':>10} {'model s':>10} {'values s':>10} {'speedup':>10} "
+            f"{'model+db s':>11} {'values+db s':>12} {'speedup':>10}"
+        )
+
+        for count in options['rows']:
+            with transaction.atomic():
+                upload = self._create_upload(count)
+                queryset = Equipment.objects.filter(upload=upload).order_by('-created_at', '-id')
+                value_fields = EquipmentReadSerializer.value_fields()
+
+                instances = list(queryset)
+                rows = list(queryset.values(*value_fields))
+                self._check_identical(instances, rows)
+
+                model = self._best(options['repeat'], lambda: EquipmentSerializer(instances, many=True).data)
+                fast = self._best(options['repeat'], lambda: EquipmentReadSerializer(rows, many=True).data)
+                model_db = self._best(
+                    options['repeat'], lambda: EquipmentSerializer(list(queryset.all()), many=True).data
+                )
+                fast_db = self._best(
+                    options['repeat'],
+                    lambda: EquipmentReadSerializer(list(queryset.values(*value_fields)), many=True).data
+                )
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f'{count:>10} {model:10.3f} {fast:10.3f} {model / fast:9.1f}x '
+                f'{model_db:11.3f} {fast_db:12.3f} {model_db / fast_db:9.1f}x'
+            )
+
+    def _create_upload(self, count):
+        user = User.objects.create_user(username='serializer-benchmark')
+        upload = DataUpload.objects.create(user=user, filename='benchmark.csv', total_records=count)
+        Equipment.objects.bulk_create(
+            (
+                Equipment(
+                    upload=upload,
+                    equipment_name=f'Pump-{i}',
+                    equipment_type='pump',
+                    flowrate=100 + i % 50 + 0.25,
+                    pressure=5 + i % 7,
+                    temperature=80 + i % 30,
+                )
+                for i in range(count)
+            ),
+            batch_size=2000
+        )
+        return upload
+
+    def _check_identical(self, instances, rows):
+        expected = json.dumps(EquipmentSerializer(instances, many=True).data, cls=JSONEncoder)
+        actual = json.dumps(EquipmentReadSerializer(rows, many=True).data, cls=JSONEncoder)
+        if expected != actual:
+            raise CommandError('Read serializer output differs from EquipmentSerializer')
+
+    def _best(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,59 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from equipment.ingest import REQUIRED_COLUMNS, process_csv
+
+
+class Command(BaseCommand):
+    help = (
+        'Run N CSV uploads in parallel threads against the configured database '
+        'and fail if any of them errors (e.g. "database is locked")'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uploads', type=int, default=8, help='Number of parallel uploads')
+        parser.add_argument('--rows', type=int, default=20000, help='Equipment rows per upload')
+
+    def handle(self, *args, **options):
+        count = options['uploads']
+        csv_text = self._make_csv(options['rows'])
+
+        # One throwaway user per upload, like separate operators
+        users = [User.objects.create_user(username=f'concurrency-check-{i}') for i in range(count)]
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                results = list(pool.map(lambda user: self._upload(user, csv_text), users))
+            elapsed = time.perf_counter() - start
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        failures = [error for _, error in results if error]
+        for seconds, error in results:
+            self.stdout.write(f'{seconds:8.2f}s  {error or "ok"}')
+        self.stdout.write(f'{count} uploads of {options["rows"]} rows in {elapsed:.2f}s on {connection.vendor}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {count} uploads failed')
+        self.stdout.write(self.style.SUCCESS('All uploads completed'))
+
+    def _make_csv(self, rows):
+        lines = [','.join(REQUIRED_COLUMNS)]
+        lines.extend(f'Pump-{i},Pump,{100 + i % 50},{5 + i % 7},{80 + i % 30}' for i in range(rows))
+        return '\n'.join(lines)
+
+    def _upload(self, user, csv_text):
+        start = time.perf_counter()
+        try:
+            process_csv(user, io.StringIO(csv_text), 'concurrency.csv')
+            error = None
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        finally:
+            connection.close()
+        return time.perf_counter() - start, error
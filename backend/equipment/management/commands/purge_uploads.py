@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from equipment.retention import purge_old_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete uploads beyond each user's retention count (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only purge uploads for this username')
+        parser.add_argument(
+            '--keep', type=int,
+            help='Uploads to keep per user, overriding profile and UPLOAD_RETENTION'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(uploads__isnull=False).distinct().select_related('profile')
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        deleted = 0
+        for user in users.iterator():
+            upload_ids = purge_old_uploads(user, options['keep'])
+            if upload_ids:
+                self.stdout.write(f'{user.username}: deleted {len(upload_ids)} upload(s)')
+            deleted += len(upload_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} upload(s)'))
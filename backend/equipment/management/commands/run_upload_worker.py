@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from equipment.jobs import reclaim_stale_jobs, run_upload_job
+from equipment.models import UploadJob
+
+
+class Command(BaseCommand):
+    help = 'Process pending CSV upload jobs (use with UPLOAD_JOB_EXECUTOR=equipment.jobs.QueuedJobExecutor)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            reclaimed = reclaim_stale_jobs()
+            if reclaimed:
+                self.stdout.write(f'Reclaimed {reclaimed} stale running upload job(s)')
+
+            pending = list(
+                UploadJob.objects.filter(status=UploadJob.STATUS_PENDING)
+                .order_by('created_at').values_list('pk', flat=True)
+            )
+            for job_id in pending:
+                job = run_upload_job(job_id)
+                if job is not None:
+                    self.stdout.write(f'Upload job {job.pk} {job.status}')
+
+            if options['once']:
+                break
+            if not pending:
+                time.sleep(options['interval'])
@@ -0,0 +1,138 @@
+import threading
+import time
+from bisect import bisect_left
+
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+class Histogram:
+    """Prometheus-style histogram (upper bounds are inclusive)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (le, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class QueryTimer:
+    """connection.execute_wrapper() hook counting queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request metrics kept in process memory.
+
+    Each server process keeps its own numbers, so scrape every worker (or
+    sum across them) when running several gunicorn workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.response_bytes = {}
+        self.latency = {}
+        self.db_latency = {}
+        self.db_queries = {}
+
+    def record(self, method, endpoint, status, seconds, queries, db_seconds):
+        key = (method, endpoint)
+        with self._lock:
+            request_key = (method, endpoint, str(status))
+            self.requests[request_key] = self.requests.get(request_key, 0) + 1
+            self._histogram(self.latency, key, LATENCY_BUCKETS).observe(seconds)
+            self._histogram(self.db_latency, key, LATENCY_BUCKETS).observe(db_seconds)
+            self._histogram(self.db_queries, key, QUERY_BUCKETS).observe(queries)
+
+    def record_bytes(self, method, endpoint, size):
+        key = (method, endpoint)
+        with self._lock:
+            self.response_bytes[key] = self.response_bytes.get(key, 0) + size
+
+    def _histogram(self, histograms, key, buckets):
+        if key not in histograms:
+            histograms[key] = Histogram(buckets)
+        return histograms[key]
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += _counter(
+                'http_requests_total', 'Requests handled, by endpoint and status',
+                self.requests, ('method', 'endpoint', 'status')
+            )
+            lines += _counter(
+                'http_response_size_bytes_total', 'Response body bytes sent',
+                self.response_bytes, ('method', 'endpoint')
+            )
+            lines += _histograms(
+                'http_request_duration_seconds', 'Wall time spent handling requests', self.latency
+            )
+            lines += _histograms(
+                'http_request_db_duration_seconds', 'Time spent in database queries per request',
+                self.db_latency
+            )
+            lines += _histograms('http_request_db_queries', 'Database queries per request', self.db_queries)
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _counter(name, description, values, label_names):
+    lines = [f'# HELP {name} {description}', f'# TYPE {name} counter']
+    for key, value in sorted(values.items()):
+        lines.append(f'{name}{_labels(label_names, key)} {value}')
+    return lines
+
+
+def _histograms(name, description, histograms):
+    label_names = ('method', 'endpoint')
+    lines = [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+    for key, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{_labels(label_names, key, ("le", bound))} {count}')
+        lines.append(f'{name}_sum{_labels(label_names, key)} {histogram.sum}')
+        lines.append(f'{name}_count{_labels(label_names, key)} {histogram.count}')
+    return lines
+
+
+# Process-wide registry fed by equipment.middleware.RequestMetricsMiddleware
+request_metrics = RequestMetrics()
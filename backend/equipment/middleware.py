@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import FileResponse
+
+from equipment.metrics import QueryTimer, request_metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, DB queries, DB time and response size per endpoint.
+
+    Adds a Server-Timing header to every response and feeds the in-process
+    registry served at /api/metrics/. Endpoints are labelled by URL name
+    (e.g. "equipment-list", "upload-export") so label sets stay small.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name or match.route) if match is not None else 'unmatched'
+        method = request.method
+
+        request_metrics.record(method, endpoint, response.status_code, elapsed, timer.count, timer.duration)
+
+        response['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+
+        if isinstance(response, FileResponse):
+            # Wrapping the body would hide the file from wsgi.file_wrapper
+            # (sendfile), so take the size from the headers or the file
+            size = self._file_size(response)
+            if size is not None:
+                request_metrics.record_bytes(method, endpoint, size)
+        elif response.streaming:
+            # Size is only known once the body has been sent
+            response.streaming_content = self._count_bytes(response.streaming_content, method, endpoint)
+        else:
+            request_metrics.record_bytes(method, endpoint, len(response.content))
+        return response
+
+    def _file_size(self, response):
+        if response.has_header('Content-Length'):
+            return int(response['Content-Length'])
+        try:
+            return os.fstat(response.file_to_stream.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _count_bytes(self, content, method, endpoint):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            request_metrics.record_bytes(method, endpoint, size)
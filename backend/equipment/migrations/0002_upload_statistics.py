@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataupload',
+            name='max_flowrate',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='max_pressure',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='max_temperature',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='min_flowrate',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='min_pressure',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='min_temperature',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='std_flowrate',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='std_pressure',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='std_temperature',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_upload_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataupload',
+            name='equipment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='equipment_distribution',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipment', '0003_upload_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, upload_to='upload_jobs/')),
+                ('filename', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('bytes_total', models.BigIntegerField(default=0)),
+                ('bytes_processed', models.BigIntegerField(default=0)),
+                ('rows_parsed', models.IntegerField(default=0)),
+                ('rows_inserted', models.IntegerField(default=0)),
+                ('rows_rejected', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='equipment.dataupload')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='equipment_u_status_37e18f_idx')],
+            },
+        ),
+    ]
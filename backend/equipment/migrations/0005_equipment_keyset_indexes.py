@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_upload_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['-created_at', '-id'], name='equipment_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', '-created_at', '-id'], name='equipment_upload_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', 'equipment_type'], name='equipment_upload_type_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_equipment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='upload_retention',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0006_userprofile_upload_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataupload',
+            name='ingest_report',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0007_upload_ingest_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataupload',
+            index=models.Index(fields=['user', '-uploaded_at', '-id'], name='upload_user_uploaded_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0008_upload_history_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
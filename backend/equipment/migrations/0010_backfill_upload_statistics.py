@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Avg, Count, Max, Min, StdDev
+
+
+METRICS = ('flowrate', 'pressure', 'temperature')
+
+
+def backfill_upload_statistics(apps, schema_editor):
+    """
+    Fill the statistics and type distribution added in 0002/0003 for uploads
+    created before them, which still carry the field defaults.
+    """
+    DataUpload = apps.get_model('equipment', 'DataUpload')
+    Equipment = apps.get_model('equipment', 'Equipment')
+
+    aggregates = {'count': Count('id')}
+    for metric in METRICS:
+        aggregates.update({
+            f'avg_{metric}': Avg(metric),
+            f'min_{metric}': Min(metric),
+            f'max_{metric}': Max(metric),
+            f'std_{metric}': StdDev(metric, sample=True),
+        })
+
+    for upload in DataUpload.objects.filter(equipment_count=0).iterator():
+        items = Equipment.objects.filter(upload=upload).order_by()
+        stats = items.aggregate(**aggregates)
+        if not stats['count']:
+            continue
+
+        fields = ['equipment_count', 'equipment_distribution']
+        upload.equipment_count = stats.pop('count')
+        upload.equipment_distribution = dict(sorted(
+            items.values('equipment_type').annotate(n=Count('id')).values_list('equipment_type', 'n')
+        ))
+        for field, value in stats.items():
+            setattr(upload, field, value or 0.0)
+            fields.append(field)
+        upload.save(update_fields=fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0009_uploadjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_upload_statistics, migrations.RunPython.noop),
+    ]
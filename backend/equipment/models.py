@@ -29,6 +29,10 @@ class Equipment(models.Model):
         indexes = [
             models.Index(fields=['equipment_type']),
             models.Index(fields=['upload']),
+            # Back keyset pagination on (created_at, id), optionally per upload
+            models.Index(fields=['-created_at', '-id'], name='equipment_created_id_idx'),
+            models.Index(fields=['upload', '-created_at', '-id'], name='equipment_upload_created_idx'),
+            models.Index(fields=['upload', 'equipment_type'], name='equipment_upload_type_idx'),
         ]
     
     def __str__(self):
@@ -44,11 +48,26 @@ class DataUpload(models.Model):
     avg_flowrate = models.FloatField(default=0.0)
     avg_pressure = models.FloatField(default=0.0)
     avg_temperature = models.FloatField(default=0.0)
+    min_flowrate = models.FloatField(default=0.0)
+    max_flowrate = models.FloatField(default=0.0)
+    std_flowrate = models.FloatField(default=0.0)
+    min_pressure = models.FloatField(default=0.0)
+    max_pressure = models.FloatField(default=0.0)
+    std_pressure = models.FloatField(default=0.0)
+    min_temperature = models.FloatField(default=0.0)
+    max_temperature = models.FloatField(default=0.0)
+    std_temperature = models.FloatField(default=0.0)
+    equipment_count = models.IntegerField(default=0)
+    equipment_distribution = models.JSONField(default=dict)
+    # Per-stage timings, row counts and bytes from the ingest pipeline
+    ingest_report = models.JSONField(default=dict, blank=True)
     
     class Meta:
         ordering = ['-uploaded_at']
         indexes = [
             models.Index(fields=['user', 'uploaded_at']),
+            # Back keyset pagination of a user's history on (uploaded_at, id)
+            models.Index(fields=['user', '-uploaded_at', '-id'], name='upload_user_uploaded_id_idx'),
         ]
     
     def __str__(self):
@@ -58,7 +77,50 @@ class DataUpload(models.Model):
 class UserProfile(models.Model):
     """Extended user profile"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    # Number of uploads to keep; empty falls back to settings.UPLOAD_RETENTION
+    upload_retention = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.user.username}'s profile"
+
+
+class UploadJob(models.Model):
+    """Model for tracking CSV uploads processed in the background"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_jobs')
+    upload = models.ForeignKey(DataUpload, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    file = models.FileField(upload_to='upload_jobs/', blank=True)
+    filename = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    bytes_total = models.BigIntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    rows_parsed = models.IntegerField(default=0)
+    rows_inserted = models.IntegerField(default=0)
+    rows_rejected = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed with progress while running; a stale value means the
+    # process running the job died and it can be reclaimed
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
@@ -0,0 +1,159 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the full ordering tuple.
+
+    DRF's CursorPagination seeks on the first ordering field only and
+    falls back to OFFSET for rows sharing that value, which is every row of
+    a bulk-inserted chunk. Here the cursor holds the values of every
+    ordering field of the last row served, and the next page is filtered
+    with (a, b) < (a0, b0), so each page is an index range scan whatever
+    its depth. The ordering must end with a unique field and use one
+    direction throughout.
+
+    Responses have the same shape as CursorPagination: next, previous and
+    results, without a count.
+    """
+    ordering = ('-id',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        # Reverse pages (following "previous") are read in the opposite
+        # order and flipped back afterwards
+        backwards = self.descending != reverse
+        order = [f'-{name}' if backwards else name for name in self.fields]
+        queryset = queryset.order_by(*order)
+        if position is not None:
+            queryset = queryset.filter(self._seek(position, backwards))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.first_position = self._position(rows[0]) if rows else position
+        self.last_position = self._position(rows[-1]) if rows else position
+        return rows
+
+    def _seek(self, position, backwards):
+        # (a, b, c) < (a0, b0, c0) expanded into ORed prefix matches, plus a
+        # bound on the leading field so the index range can be used
+        lookup = 'lt' if backwards else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            prefix = {self.fields[i]: position[i] for i in range(index)}
+            condition |= Q(**prefix, **{f'{name}__{lookup}': position[index]})
+        return Q(**{f'{self.fields[0]}__{lookup}e': position[0]}) & condition
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.fields]
+        return [getattr(row, name) for name in self.fields]
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size) if self.max_page_size else size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def decode_cursor(self, request, model):
+        """Return (position values, reverse) from the request, or (None, False)"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = data['p']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(data.get('r'))
+
+    def encode_cursor(self, position, reverse):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        data = {'p': values, 'r': 1} if reverse else {'p': values}
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class EquipmentCursorPagination(KeysetCursorPagination):
+    """Keyset pagination for equipment ordered by (created_at, id)"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 1000
+
+
+class HistoryCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination for a user's uploads ordered by (uploaded_at, id).
+
+    Clients follow the next link to load history page by page, however
+    many uploads the retention setting keeps.
+    """
+    ordering = ('-uploaded_at', '-id')
+    page_size = 50
+    max_page_size = 500
@@ -0,0 +1,30 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it is installed"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # orjson always rejects NaN/Infinity, so leave non-strict parsing to json
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
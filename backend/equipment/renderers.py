@@ -0,0 +1,69 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# Types DRF's JSONEncoder formats differently from orjson are passed to
+# its default() hook; non-string keys are stringified like the json module
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+    if orjson is not None else 0
+)
+
+# orjson writes floats below 1e-4 or from 1e16 up differently from repr()
+# ("1e-7" / "0.00001" / "1e16" vs "1e-07" / "1e-05" / "1e+16")
+EXPONENT = re.compile(rb'e[-\d]')
+SMALL_FRACTION = re.compile(rb'0\.0000\d')
+
+
+def has_non_repr_float(content):
+    """
+    True if orjson output may contain a float json would format differently.
+
+    Only cheap substring checks are used; false positives (for example
+    inside strings) just mean the payload is re-rendered with json.
+    """
+    # Exponents follow a digit; small fractions start a number ("0.00001", not "10.00001")
+    if any(content[match.start() - 1:match.start()].isdigit() for match in EXPONENT.finditer(content)):
+        return True
+    return any(
+        not content[match.start() - 1:match.start()].isdigit() for match in SMALL_FRACTION.finditer(content)
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches the stdlib renderer for the default compact, unicode
+    settings; anything else (indented output for the browsable API,
+    ensure_ascii, non-strict JSON) falls back to the stdlib encoder.
+    Unlike the stdlib encoder, NaN and Infinity are written as null
+    instead of raising.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+            or self.ensure_ascii or not self.compact or not self.strict
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        if has_non_repr_float(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, so the output is valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
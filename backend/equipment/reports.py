@@ -0,0 +1,261 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak
+)
+
+from equipment.models import DataUpload
+
+
+# Bump whenever the report layout changes so cached PDFs are re-rendered
+REPORT_TEMPLATE_VERSION = 1
+
+# 'summary' previews the first rows; 'full' renders every equipment row
+REPORT_MODE_SUMMARY = 'summary'
+REPORT_MODE_FULL = 'full'
+REPORT_MODES = (REPORT_MODE_SUMMARY, REPORT_MODE_FULL)
+
+SUMMARY_ROW_LIMIT = 20
+
+EQUIPMENT_COLUMNS = ('equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature')
+EQUIPMENT_HEADER = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+EQUIPMENT_COL_WIDTHS = [1.5*inch, 1.2*inch, 1.1*inch, 1.1*inch, 1.1*inch]
+
+# Fixed row height lets ReportLab skip measuring every cell and lets us
+# size each full-report table to exactly one page
+EQUIPMENT_ROW_HEIGHT = 14
+
+# Styles are fixed, so build them once per process rather than per request
+STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1f4788'),
+    spaceAfter=30,
+    alignment=1
+)
+
+HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+])
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+EQUIPMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
+])
+
+
+def render_report(upload, out, mode=REPORT_MODE_SUMMARY):
+    """
+    Render the PDF report for a DataUpload into a writable file object.
+
+    Equipment rows are read with values_list() rather than model
+    instances; full reports stream them with .iterator() and build page
+    tables lazily, which reduces but does not bound peak memory.
+    """
+    doc = SimpleDocTemplate(out, pagesize=letter)
+    elements = []
+
+    # Title
+    elements.append(Paragraph('Chemical Equipment Analysis Report', TITLE_STYLE))
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Header info
+    header_data = [
+        ['Report Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Upload File:', upload.filename],
+        ['Total Records:', str(upload.total_records)],
+    ]
+    header_table = Table(header_data, colWidths=[2*inch, 4*inch])
+    header_table.setStyle(HEADER_TABLE_STYLE)
+    elements.append(header_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Summary statistics
+    elements.append(Paragraph('Summary Statistics', STYLES['Heading2']))
+    summary_data = [
+        ['Metric', 'Value'],
+        ['Average Flowrate', f"{upload.avg_flowrate:.2f}"],
+        ['Average Pressure', f"{upload.avg_pressure:.2f}"],
+        ['Average Temperature', f"{upload.avg_temperature:.2f}"],
+    ]
+    summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
+    summary_table.setStyle(SUMMARY_TABLE_STYLE)
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Equipment list
+    elements.append(Paragraph('Equipment Details', STYLES['Heading2']))
+    rows = upload.equipment_items.order_by('id').values_list(*EQUIPMENT_COLUMNS)
+
+    if mode == REPORT_MODE_FULL:
+        doc.build(_FlowableStream(elements, _equipment_pages(doc, rows.iterator(chunk_size=2000))))
+    else:
+        elements.append(_equipment_table(rows[:SUMMARY_ROW_LIMIT]))
+        doc.build(elements)
+
+
+def _equipment_table(rows, table_class=Table):
+    data = [EQUIPMENT_HEADER]
+    data.extend(
+        [name, equipment_type, f"{flowrate:.2f}", f"{pressure:.2f}", f"{temperature:.2f}"]
+        for name, equipment_type, flowrate, pressure, temperature in rows
+    )
+    table = table_class(
+        data,
+        colWidths=EQUIPMENT_COL_WIDTHS,
+        rowHeights=[EQUIPMENT_ROW_HEIGHT] * len(data),
+        repeatRows=1
+    )
+    table.setStyle(EQUIPMENT_TABLE_STYLE)
+    return table
+
+
+def _equipment_pages(doc, rows):
+    """
+    Yield one page-sized LongTable per page of equipment rows.
+
+    Each table carries its own header row and is followed by a page break,
+    so headers repeat on every page. If the first table does not fit below
+    the report header, LongTable splits it and repeats the header itself.
+    """
+    # Frame padding is 6pt on each side; keep one row free for the header
+    rows_per_page = int((doc.height - 12) // EQUIPMENT_ROW_HEIGHT) - 1
+    page = []
+    first = True
+    for row in rows:
+        page.append(row)
+        if len(page) == rows_per_page:
+            if not first:
+                yield PageBreak()
+            yield _equipment_table(page, LongTable)
+            page = []
+            first = False
+    if page or first:
+        if not first:
+            yield PageBreak()
+        yield _equipment_table(page, LongTable)
+
+
+class _FlowableStream(list):
+    """
+    Flowable list that is topped up lazily from an iterator.
+
+    doc.build() consumes flowables from the front of the list, so only a
+    small window of page tables (and their rows) is held at a time. This
+    does not make memory flat: ReportLab keeps every finished page until
+    the PDF is saved, so peak memory still grows with the page count.
+    """
+
+    def __init__(self, head, tail, window=4):
+        super().__init__(head)
+        self._tail = iter(tail)
+        self._window = window
+
+    def _fill(self):
+        while self._tail is not None and list.__len__(self) < self._window:
+            try:
+                self.append(next(self._tail))
+            except StopIteration:
+                self._tail = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._fill()
+
+
+def get_report_dir():
+    return getattr(settings, 'REPORT_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'reports'))
+
+
+def report_path(upload, mode=REPORT_MODE_SUMMARY):
+    """
+    Cache path for an upload's report.
+
+    Uploads never change once ingested, so the key is derived from the
+    upload's identity, the report mode and the report template version.
+    """
+    raw = f'{upload.pk}:{upload.uploaded_at.isoformat()}:{mode}:{REPORT_TEMPLATE_VERSION}'
+    digest = hashlib.sha256(raw.encode()).hexdigest()[:32]
+    return os.path.join(get_report_dir(), f'report_{upload.pk}_{mode}_{digest}.pdf')
+
+
+def get_or_render_report(upload, mode=REPORT_MODE_SUMMARY):
+    """Return the path of the cached report for an upload, rendering it on a miss"""
+    path = report_path(upload, mode)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Render to a temporary file and rename so readers never see a partial PDF
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            render_report(upload, out, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def render_report_in_background(upload_id):
+    """Pre-render the report for an upload (run off the request path)"""
+    upload = DataUpload.objects.filter(pk=upload_id).first()
+    if upload is not None:
+        get_or_render_report(upload)
+
+
+def delete_cached_reports(upload_id):
+    """Remove every cached report for an upload"""
+    report_dir = get_report_dir()
+    if not os.path.isdir(report_dir):
+        return
+    prefix = f'report_{upload_id}_'
+    for name in os.listdir(report_dir):
+        if name.startswith(prefix):
+            try:
+                os.unlink(os.path.join(report_dir, name))
+            except FileNotFoundError:
+                pass
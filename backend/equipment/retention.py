@@ -0,0 +1,57 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import router, transaction
+
+from equipment.cache import bump_data_version
+from equipment.models import Equipment, DataUpload, UploadJob, UserProfile
+from equipment.reports import delete_cached_reports
+
+
+DEFAULT_RETENTION = 5
+
+
+def get_upload_retention(user):
+    """Return how many uploads to keep for a user (0 keeps all of them)"""
+    try:
+        retention = user.profile.upload_retention
+    except UserProfile.DoesNotExist:
+        retention = None
+    if retention is None:
+        return getattr(settings, 'UPLOAD_RETENTION', DEFAULT_RETENTION)
+    return retention
+
+
+def purge_old_uploads(user, keep=None):
+    """
+    Keep only the user's most recent uploads; return the deleted upload ids.
+
+    Equipment rows and uploads are removed with one set-based DELETE each
+    instead of going through Django's cascade collector, which would load
+    every row first. That also skips the delete signals, so the cache
+    invalidation and report cleanup they do are scheduled here.
+    """
+    if keep is None:
+        keep = get_upload_retention(user)
+    if not keep:
+        return []
+
+    with transaction.atomic():
+        upload_ids = list(
+            DataUpload.objects.filter(user=user)
+            .order_by('-uploaded_at', '-id').values_list('pk', flat=True)[keep:]
+        )
+        if not upload_ids:
+            return []
+
+        using = router.db_for_write(DataUpload)
+        Equipment.objects.filter(upload_id__in=upload_ids)._raw_delete(using)
+        # UploadJob.upload is SET_NULL, which the collector would have done
+        UploadJob.objects.filter(upload_id__in=upload_ids).update(upload=None)
+        DataUpload.objects.filter(pk__in=upload_ids)._raw_delete(using)
+
+        transaction.on_commit(partial(bump_data_version, user.pk))
+        for upload_id in upload_ids:
+            transaction.on_commit(partial(delete_cached_reports, upload_id))
+
+    return upload_ids
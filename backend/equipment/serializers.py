@@ -1,6 +1,10 @@
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth.models import User
-from equipment.models import Equipment, DataUpload, UserProfile
+from equipment.jobs import get_job_progress
+from equipment.models import Equipment, DataUpload, UploadJob, UserProfile
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -18,22 +22,117 @@ class EquipmentSerializer(serializers.ModelSerializer):
 
 
 class DataUploadSerializer(serializers.ModelSerializer):
-    equipment_count = serializers.SerializerMethodField()
-    equipment_distribution = serializers.SerializerMethodField()
-    
     class Meta:
         model = DataUpload
         fields = ('id', 'filename', 'uploaded_at', 'total_records', 'avg_flowrate', 
-                  'avg_pressure', 'avg_temperature', 'equipment_count', 'equipment_distribution')
-        read_only_fields = ('id', 'uploaded_at')
+                  'avg_pressure', 'avg_temperature', 'min_flowrate', 'max_flowrate',
+                  'std_flowrate', 'min_pressure', 'max_pressure', 'std_pressure',
+                  'min_temperature', 'max_temperature', 'std_temperature',
+                  'equipment_count', 'equipment_distribution')
+        read_only_fields = ('id', 'uploaded_at', 'equipment_count', 'equipment_distribution')
+
+
+class DataUploadIngestSerializer(DataUploadSerializer):
+    """
+    Upload with its ingest timing report, returned only to the request (or
+    job) that created it. The profile dump path is server-side detail and
+    is left out.
+    """
+    ingest_report = serializers.SerializerMethodField()
+    
+    class Meta(DataUploadSerializer.Meta):
+        fields = DataUploadSerializer.Meta.fields + ('ingest_report',)
     
-    def get_equipment_count(self, obj):
-        return obj.equipment_items.count()
+    def get_ingest_report(self, obj):
+        return {key: value for key, value in obj.ingest_report.items() if key != 'profile'}
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer for queryset.values() rows.
+
+    Returns the same representation as `serializer_class`, but resolves its
+    fields once into per-field converters instead of running the
+    ModelSerializer field machinery for every object.
+    """
+    serializer_class = None
+
+    # Fields whose to_representation() is a plain type cast (or a no-op
+    # on values() rows) and can skip the field object entirely
+    FAST_CONVERTERS = {
+        serializers.IntegerField: int,
+        serializers.FloatField: float,
+        serializers.CharField: str,
+        serializers.JSONField: None,
+        serializers.PrimaryKeyRelatedField: None,
+    }
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def value_fields(cls):
+        """Field names to pass to queryset.values()"""
+        return tuple(cls.serializer_class.Meta.fields)
+
+    @classmethod
+    def get_fields(cls):
+        if '_fields' not in cls.__dict__:
+            cls._fields = cls.serializer_class().fields
+        return cls._fields
+
+    def get_converter(self, field):
+        """Return a callable matching field.to_representation(), or None for no-op"""
+        if type(field) in self.FAST_CONVERTERS:
+            return self.FAST_CONVERTERS[type(field)]
+
+        # Model CharField values are already the (string) choice keys
+        if type(field) is serializers.ChoiceField and all(
+            isinstance(key, str) for key in field.choice_strings_to_values.values()
+        ):
+            return None
+
+        if type(field) is serializers.DateTimeField:
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if output_format and output_format.lower() == ISO_8601 and field_timezone is not None:
+                def convert(value):
+                    if isinstance(value, str) or timezone.is_naive(value):
+                        return field.to_representation(value)
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+                return convert
 
-    def get_equipment_distribution(self, obj):
-        from django.db.models import Count
-        dist = obj.equipment_items.values('equipment_type').annotate(count=Count('equipment_type'))
-        return {item['equipment_type']: item['count'] for item in dist}
+        return field.to_representation
+
+    def to_representation(self, row, converters=None):
+        if converters is None:
+            converters = self.get_converters()
+        data = {}
+        for name, convert in converters:
+            value = row[name]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def get_converters(self):
+        # Resolved per serializer, since the active timezone can differ per request
+        return tuple((name, self.get_converter(field)) for name, field in self.get_fields().items())
+
+    @property
+    def data(self):
+        converters = self.get_converters()
+        if self.many:
+            return [self.to_representation(row, converters) for row in self.instance]
+        return self.to_representation(self.instance, converters)
+
+
+class EquipmentReadSerializer(ValuesSerializer):
+    serializer_class = EquipmentSerializer
+
+
+class DataUploadReadSerializer(ValuesSerializer):
+    serializer_class = DataUploadSerializer
 
 
 class DataSummarySerializer(serializers.Serializer):
@@ -53,6 +152,38 @@ class UploadCSVSerializer(serializers.Serializer):
     def validate_file(self, value):
         if not value.name.endswith('.csv'):
             raise serializers.ValidationError("File must be a CSV file")
-        if value.size > 5242880:  # 5MB
-            raise serializers.ValidationError("File size must be less than 5MB")
+        max_size = settings.MAX_UPLOAD_SIZE
+        if max_size and value.size > max_size:
+            raise serializers.ValidationError(
+                f"File size must be less than {max_size // (1024 * 1024)}MB"
+            )
         return value
+
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    """Serializer for background upload job status"""
+    progress = serializers.SerializerMethodField()
+    upload = DataUploadIngestSerializer(read_only=True)
+    
+    class Meta:
+        model = UploadJob
+        fields = ('id', 'filename', 'status', 'progress', 'bytes_total', 'bytes_processed',
+                  'rows_parsed', 'rows_inserted', 'rows_rejected', 'error', 'upload',
+                  'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+    
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        if obj.status == UploadJob.STATUS_RUNNING:
+            data.update(get_job_progress(obj.pk) or {})
+            data['progress'] = self._percent(data['bytes_processed'], obj.bytes_total)
+        return data
+    
+    def get_progress(self, obj):
+        if obj.status in (UploadJob.STATUS_COMPLETED, UploadJob.STATUS_FAILED):
+            return 100
+        return self._percent(obj.bytes_processed, obj.bytes_total)
+    
+    @staticmethod
+    def _percent(done, total):
+        return min(100, int(done * 100 / total)) if total else 0
@@ -1,7 +1,16 @@
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from equipment.models import UserProfile
+from rest_framework.authtoken.models import Token
+from equipment.authentication import invalidate_cached_token
+from equipment.cache import bump_data_version
+from equipment.models import DataUpload, UserProfile
+from equipment.reports import delete_cached_reports
 
 
 @receiver(post_save, sender=User)
@@ -9,3 +18,44 @@ def create_user_profile(sender, instance, created, **kwargs):
     """Create UserProfile when User is created"""
     if created:
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a deleted token from the auth cache"""
+    invalidate_cached_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached token lookups so user changes (e.g. deactivation) apply at once"""
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidate_cached_token(key)
+
+
+@receiver(post_save, sender=DataUpload)
+@receiver(post_delete, sender=DataUpload)
+def invalidate_user_data_cache(sender, instance, **kwargs):
+    """Invalidate cached summary/history once upload changes are committed"""
+    transaction.on_commit(partial(bump_data_version, instance.user_id))
+
+
+@receiver(post_delete, sender=DataUpload)
+def delete_upload_reports(sender, instance, **kwargs):
+    """Remove cached PDF reports for a deleted upload"""
+    transaction.on_commit(partial(delete_cached_reports, instance.pk))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply journal and sync pragmas to new SQLite connections"""
+    if connection.vendor != 'sqlite':
+        return
+    journal_mode = getattr(settings, 'SQLITE_JOURNAL_MODE', None)
+    synchronous = getattr(settings, 'SQLITE_SYNCHRONOUS', None)
+    with connection.cursor() as cursor:
+        if journal_mode:
+            cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        if synchronous:
+            cursor.execute(f'PRAGMA synchronous={synchronous}')
@@ -0,0 +1,84 @@
+from collections import Counter
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Streaming count, mean, min, max and variance for one metric.
+
+    Uses Welford's method, generalised to merge whole chunks at a time
+    (Chan et al.), so values never need to be held in memory together.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        """Fold a chunk of values into the running statistics"""
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        if not n:
+            return
+
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        chunk_min = float(values.min())
+        chunk_max = float(values.max())
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+    @property
+    def variance(self):
+        """Sample variance of the values seen so far"""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class UploadStatistics:
+    """Per-metric running statistics and per-type counts for an upload"""
+
+    def __init__(self, metrics):
+        self.metrics = {metric: RunningStats() for metric in metrics}
+        self.type_counts = Counter()
+
+    @property
+    def count(self):
+        return next(iter(self.metrics.values())).count if self.metrics else 0
+
+    def update(self, cleaned):
+        """Fold a cleaned equipment DataFrame chunk into the statistics"""
+        for metric, stats in self.metrics.items():
+            stats.update(cleaned[metric].to_numpy())
+        self.type_counts.update(cleaned['equipment_type'].value_counts().to_dict())
+
+    def apply(self, upload):
+        """Copy the statistics onto a DataUpload and return the changed fields"""
+        fields = []
+        for metric, stats in self.metrics.items():
+            setattr(upload, f'avg_{metric}', stats.mean)
+            setattr(upload, f'min_{metric}', stats.min or 0.0)
+            setattr(upload, f'max_{metric}', stats.max or 0.0)
+            setattr(upload, f'std_{metric}', stats.stddev)
+            fields += [f'avg_{metric}', f'min_{metric}', f'max_{metric}', f'std_{metric}']
+
+        upload.equipment_count = self.count
+        upload.equipment_distribution = dict(sorted(self.type_counts.items()))
+        return fields + ['equipment_count', 'equipment_distribution']
@@ -0,0 +1,471 @@
+import io
+import tempfile
+import threading
+import time as time_module
+import unittest
+from unittest import mock
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from equipment.authentication import _token_key
+from equipment.ingest import process_csv
+from equipment.ingest_backends import EQUIPMENT_COLUMNS, BulkCreateIngestBackend, PostgresCopyIngestBackend
+from equipment.metrics import request_metrics
+from equipment.middleware import RequestMetricsMiddleware
+from equipment.jobs import JobProgress, reclaim_stale_jobs
+from equipment.models import DataUpload, Equipment, UploadJob
+from equipment.renderers import ORJSONRenderer, orjson
+
+
+CSV = """Equipment Name,Type,Flowrate,Pressure,Temperature
+Pump-1,Pump,10,5,80
+Pump-2,Pump,20,6,90
+Valve-1,Valve,30,7,100
+"""
+
+
+class EquipmentWriteStatisticsTests(APITestCase):
+    """Equipment writes keep the statistics stored on their upload current"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='operator', password='secret')
+        self.client.force_authenticate(self.user)
+        self.upload = process_csv(self.user, io.StringIO(CSV), 'plant.csv')
+        self.pump = self.upload.equipment_items.get(equipment_name='Pump-1')
+
+    def write(self, method, url, data=None):
+        # Run the on_commit data version bumps, as a real request would
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format='json')
+
+    def summary(self):
+        return self.client.get('/api/summary/').json()
+
+    def test_update_recomputes_summary(self):
+        self.assertEqual(self.summary()['avg_flowrate'], 20.0)
+
+        response = self.write('patch', f'/api/equipment/{self.pump.pk}/', {'flowrate': 1000})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.summary()['avg_flowrate'], 350.0)
+
+    def test_update_moves_last_modified(self):
+        last_modified = self.client.get('/api/summary/')['Last-Modified']
+        self.assertEqual(self.client.get('/api/summary/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # Land the edit in a later second than the first response
+        later = time_module.time_ns() + 2 * 10 ** 9
+        with mock.patch('equipment.cache.time.time_ns', return_value=later):
+            self.write('patch', f'/api/equipment/{self.pump.pk}/', {'flowrate': 1000})
+
+        response = self.client.get('/api/summary/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+    def test_create_and_destroy_recompute_counts_and_distribution(self):
+        response = self.write('post', '/api/equipment/', {
+            'equipment_name': 'Reactor-1', 'equipment_type': 'reactor',
+            'flowrate': 40, 'pressure': 8, 'temperature': 110, 'upload': self.upload.pk,
+        })
+        self.assertEqual(response.status_code, 201)
+
+        summary = self.summary()
+        self.assertEqual(summary['total_count'], 4)
+        self.assertEqual(summary['equipment_type_distribution'], {'other': 1, 'pump': 2, 'reactor': 1})
+
+        self.write('delete', f'/api/equipment/{self.pump.pk}/')
+
+        summary = self.summary()
+        self.assertEqual(summary['total_count'], 3)
+        self.assertEqual(summary['equipment_type_distribution'], {'other': 1, 'pump': 1, 'reactor': 1})
+        history = self.client.get('/api/history/').json()['results']
+        self.assertEqual(history[0]['equipment_count'], 3)
+
+
+class EquipmentKeysetPaginationTests(APITestCase):
+    """Equipment pages seek on (created_at, id), even when timestamps tie"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='operator', password='secret')
+        self.client.force_authenticate(self.user)
+        upload = process_csv(self.user, io.StringIO(CSV), 'plant.csv')
+
+        # A bulk-loaded chunk: every row shares one created_at
+        Equipment.objects.bulk_create([
+            Equipment(upload=upload, equipment_name=f'Tank-{i}', equipment_type='tank',
+                      flowrate=i, pressure=1, temperature=1)
+            for i in range(250)
+        ])
+        Equipment.objects.update(created_at=timezone.now())
+        self.ids = list(Equipment.objects.order_by('-id').values_list('id', flat=True))
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(url).json()
+            for query in queries.captured_queries:
+                self.assertNotIn('OFFSET', query['sql'].upper())
+            pages.append([row['id'] for row in body['results']])
+            url = body[link]
+        return pages
+
+    def test_pages_cover_tied_rows_without_offset(self):
+        pages = self.walk('/api/equipment/?page_size=40', 'next')
+
+        self.assertEqual([len(page) for page in pages], [40] * 6 + [13])
+        self.assertEqual(sum(pages, []), self.ids)
+
+    def test_previous_links_walk_back(self):
+        forward = self.walk('/api/equipment/?page_size=40', 'next')
+        last = self.client.get('/api/equipment/?page_size=40').json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+
+        backward = self.walk(last['previous'], 'previous')
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/equipment/?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class StaleJobReclaimTests(TransactionTestCase):
+    """Running jobs whose process died go back to the queue"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='operator', password='secret')
+
+    def job(self, heartbeat_age):
+        return UploadJob.objects.create(
+            user=self.user, filename='plant.csv', status=UploadJob.STATUS_RUNNING,
+            rows_parsed=100, heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+        )
+
+    def test_only_jobs_without_recent_heartbeat_are_reclaimed(self):
+        stale, alive = self.job(3600), self.job(5)
+
+        with self.settings(UPLOAD_JOB_STALE_TIMEOUT=600):
+            self.assertEqual(reclaim_stale_jobs(), 1)
+
+        stale.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(stale.status, UploadJob.STATUS_PENDING)
+        self.assertEqual(stale.rows_parsed, 0)
+        self.assertEqual(alive.status, UploadJob.STATUS_RUNNING)
+
+    def test_long_running_job_with_recent_progress_is_kept(self):
+        job = self.job(3600)
+        progress = JobProgress(job.pk)
+        try:
+            progress.publish(bytes_processed=512, rows_parsed=40, rows_inserted=40, rows_rejected=0)
+
+            with self.settings(UPLOAD_JOB_STALE_TIMEOUT=600):
+                self.assertEqual(reclaim_stale_jobs(), 0)
+        finally:
+            progress.close()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_RUNNING)
+
+
+@unittest.skipIf(connection.vendor == 'sqlite', 'SQLite keeps job progress in the cache')
+class JobProgressTests(TransactionTestCase):
+    """Progress is visible to other connections while the ingest transaction is open"""
+
+    def test_progress_is_written_to_the_job_row(self):
+        user = User.objects.create_user(username='operator', password='secret')
+        job = UploadJob.objects.create(user=user, filename='plant.csv', status=UploadJob.STATUS_RUNNING)
+        progress = JobProgress(job.pk)
+
+        try:
+            with transaction.atomic():
+                progress.publish(bytes_processed=512, rows_parsed=40, rows_inserted=38, rows_rejected=2)
+                job.refresh_from_db()
+        finally:
+            progress.close()
+
+        self.assertEqual((job.bytes_processed, job.rows_parsed, job.rows_rejected), (512, 40, 2))
+        self.assertIsNotNone(job.heartbeat_at)
+
+
+class UploadStatisticsBackfillMigrationTests(TransactionTestCase):
+    """0010 fills statistics for uploads created before they were stored"""
+
+    before = [('equipment', '0009_uploadjob_heartbeat')]
+    after = [('equipment', '0010_backfill_upload_statistics')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfills_statistics_and_distribution(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('auth', 'User').objects.create(username='operator')
+        upload = apps.get_model('equipment', 'DataUpload').objects.create(
+            user_id=user.pk, filename='plant.csv', total_records=3,
+        )
+        Equipment = apps.get_model('equipment', 'Equipment')
+        for name, kind, flowrate in [('Pump-1', 'pump', 10), ('Pump-2', 'pump', 20), ('Valve-1', 'other', 30)]:
+            Equipment.objects.create(
+                upload_id=upload.pk, equipment_name=name, equipment_type=kind,
+                flowrate=flowrate, pressure=5, temperature=80,
+            )
+
+        apps = self.migrate(self.after)
+        upload = apps.get_model('equipment', 'DataUpload').objects.get(pk=upload.pk)
+
+        self.assertEqual(upload.equipment_count, 3)
+        self.assertEqual(upload.equipment_distribution, {'other': 1, 'pump': 2})
+        self.assertEqual((upload.min_flowrate, upload.max_flowrate), (10, 30))
+        self.assertAlmostEqual(upload.std_flowrate, 10.0)
+        self.assertEqual(upload.std_pressure, 0.0)
+
+
+class IngestReportExposureTests(APITestCase):
+    """The ingest report is returned to the uploader only, without the profile path"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='operator', password='secret')
+        self.client.force_authenticate(self.user)
+
+    def test_report_only_in_upload_response(self):
+        with tempfile.TemporaryDirectory() as profile_dir, self.settings(INGEST_PROFILE_DIR=profile_dir):
+            response = self.client.post('/api/upload-csv/', {
+                'file': SimpleUploadedFile('plant.csv', CSV.encode(), content_type='text/csv'),
+            }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('stages', response.json()['ingest_report'])
+        self.assertNotIn('profile', response.json()['ingest_report'])
+        self.assertIn('profile', DataUpload.objects.get().ingest_report)
+
+        history = self.client.get('/api/history/').json()['results']
+        self.assertNotIn('ingest_report', history[0])
+        recent = self.client.get('/api/summary/').json()['recent_uploads']
+        self.assertNotIn('ingest_report', recent[0])
+
+
+@unittest.skipIf(orjson is None, 'orjson is not installed')
+class ORJSONRendererTests(SimpleTestCase):
+    """ORJSONRenderer output is byte-identical to DRF's JSONRenderer"""
+
+    def assertSameBytes(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data), data)
+
+    def test_floats(self):
+        for value in [
+            0.0, -0.0, 0.1, 1 / 3, 85.25, 10.00001, 1e-4, 1e-5, 0.00001234, 1e-7, -2.5e-10,
+            5e-324, 1e15, 1e16, 1.5e16, 123456789012345678.0, 1.7976931348623157e308,
+        ]:
+            self.assertSameBytes({'value': value, 'values': [value, -value]})
+
+    def test_datetimes(self):
+        self.assertSameBytes({
+            'utc': datetime(2024, 1, 22, 10, 35, 0, 123456, tzinfo=dt_timezone.utc),
+            'whole_seconds': datetime(2024, 1, 22, 10, 35, tzinfo=dt_timezone.utc),
+            'offset': datetime(2024, 1, 22, 10, 35, 0, 500, tzinfo=dt_timezone(timedelta(hours=5, minutes=30))),
+            'naive': datetime(2024, 1, 22, 10, 35, 0, 7),
+            'date': date(2024, 1, 22),
+            'time': time(10, 35, 0, 250000),
+            'duration': timedelta(days=1, seconds=5),
+        })
+
+    def test_decimals(self):
+        for value in [Decimal('1.10'), Decimal('0'), Decimal('-3.5'), Decimal('1E-7'), Decimal('12345678901234567890')]:
+            self.assertSameBytes({'value': value})
+
+    def test_line_separators_are_escaped(self):
+        data = {'name\u2028': 'Pump\u2028A\u2029B', 'other': ['\u2029', 'caf\u00e9 \u2603 \U0001f600']}
+        self.assertSameBytes(data)
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(data))
+
+    def test_other_types(self):
+        self.assertSameBytes({
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'counts': {1: 'pump', 2: 'valve'},
+            'nested': [{'a': None, 'b': True}, (1, 2), []],
+            'text': 'quote " backslash \\ newline \n tab \t control \x01',
+        })
+
+    def test_nan_and_infinity_become_null(self):
+        # The stdlib renderer refuses non-finite floats in strict mode
+        for value in [float('nan'), float('inf'), float('-inf')]:
+            self.assertEqual(ORJSONRenderer().render({'value': value}), b'{"value":null}')
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'value': value})
+
+    def test_indented_output_uses_stdlib_encoder(self):
+        data = {'value': 1e-7, 'when': datetime(2024, 1, 22, tzinfo=dt_timezone.utc)}
+        context = {'indent': 4}
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json', context),
+            JSONRenderer().render(data, 'application/json', context),
+        )
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Token lookups are only cached where logout can invalidate them everywhere"""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='operator', password='secret')
+        self.token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_process_local_cache_is_not_used(self):
+        self.assertEqual(self.client.get('/api/summary/').status_code, 200)
+        self.assertIsNone(cache.get(_token_key(self.token.key)))
+
+    def test_shared_cache_is_used_and_invalidated_on_logout(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertEqual(self.client.get('/api/summary/').status_code, 200)
+            self.assertIsNotNone(cache.get(_token_key(self.token.key)))
+
+            self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+            self.assertIsNone(cache.get(_token_key(self.token.key)))
+            self.assertEqual(self.client.get('/api/summary/').status_code, 401)
+
+
+class RequestMetricsMiddlewareTests(SimpleTestCase):
+    """Response sizes are counted without breaking sendfile for file responses"""
+
+    def sent_bytes(self):
+        return request_metrics.response_bytes.get(('GET', 'unmatched'), 0)
+
+    def test_file_response_is_not_wrapped(self):
+        with tempfile.TemporaryFile() as fh:
+            fh.write(b'%PDF' * 1000)
+            fh.seek(0)
+            before = self.sent_bytes()
+
+            response = RequestMetricsMiddleware(lambda request: FileResponse(fh))(RequestFactory().get('/report'))
+
+            # WSGIHandler hands file_to_stream to wsgi.file_wrapper
+            self.assertIs(response.file_to_stream, fh)
+            self.assertEqual(self.sent_bytes() - before, 4000)
+
+    def test_streaming_response_is_counted_when_sent(self):
+        before = self.sent_bytes()
+        response = RequestMetricsMiddleware(
+            lambda request: StreamingHttpResponse(iter([b'a,b\n', b'1,2\n']))
+        )(RequestFactory().get('/export'))
+
+        self.assertEqual(self.sent_bytes(), before)
+        self.assertEqual(b''.join(response.streaming_content), b'a,b\n1,2\n')
+        self.assertEqual(self.sent_bytes() - before, 8)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'COPY ingest is PostgreSQL only')
+class PostgresCopyIngestBackendTests(TestCase):
+    """COPY stores exactly what bulk_create stores"""
+
+    def test_copy_matches_bulk_create(self):
+        frame = pd.DataFrame({
+            'equipment_name': [
+                'Pump, A', 'Valve "B"', 'Line\nbreak', '', 'Réacteur – 熱交換器 ✓',
+                '  padded  ', 'back\\slash', 'NULL', '"', ',',
+            ],
+            'equipment_type': ['pump', 'valve', 'other', 'other', 'reactor', 'pump', 'other', 'other', 'valve', 'pump'],
+            'flowrate': [0.1 + 0.2, 1e-7, 123456.789, 0.0, -5.5, 1e16, 2.0, 3.0, 4.0, 5.0],
+            'pressure': [5.0] * 10,
+            'temperature': [80.25] * 10,
+        })
+        user = User.objects.create_user(username='operator', password='secret')
+
+        stored = []
+        for backend in (BulkCreateIngestBackend(batch_size=3), PostgresCopyIngestBackend(batch_size=3)):
+            upload = DataUpload.objects.create(user=user, filename='plant.csv')
+            self.assertEqual(backend.write(upload, frame), len(frame))
+            stored.append(list(upload.equipment_items.order_by('id').values_list(*EQUIPMENT_COLUMNS)))
+
+        self.assertEqual(stored[1], stored[0])
+        self.assertEqual(len(stored[0]), len(frame))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Checks SQLite write locking')
+class ConcurrentUploadTests(TransactionTestCase):
+    """Parallel uploads on file-backed SQLite wait for the write lock instead of failing"""
+
+    UPLOADS = 6
+    ROWS = 3000
+
+    def upload(self, user, csv_text, errors):
+        try:
+            process_csv(user, io.StringIO(csv_text), 'concurrency.csv')
+        except Exception as e:
+            errors.append(f'{type(e).__name__}: {e}')
+        finally:
+            connection.close()
+
+    def test_parallel_uploads_all_succeed(self):
+        self.assertNotIn('memory', str(connection.settings_dict['NAME']))
+
+        lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+        lines.extend(f'Pump-{i},Pump,{100 + i % 50},{5 + i % 7},{80 + i % 30}' for i in range(self.ROWS))
+        csv_text = '\n'.join(lines)
+        users = [User.objects.create_user(username=f'operator-{i}') for i in range(self.UPLOADS)]
+
+        errors = []
+        # Several chunks per upload, so the write transactions overlap
+        with self.settings(CSV_INGEST_CHUNK_SIZE=500):
+            threads = [threading.Thread(target=self.upload, args=(user, csv_text, errors)) for user in users]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        for user in users:
+            upload = DataUpload.objects.get(user=user)
+            self.assertEqual(upload.total_records, self.ROWS)
+            self.assertEqual(upload.equipment_items.count(), self.ROWS)
+        self.assertEqual(Equipment.objects.count(), self.UPLOADS * self.ROWS)
+
+
+class MetricsAccessTests(APITestCase):
+    """/api/metrics/ is not public by default"""
+
+    def test_hidden_without_token(self):
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+            self.client.force_authenticate(User.objects.create_user(username='operator'))
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+    def test_staff_users_can_read(self):
+        self.client.force_authenticate(User.objects.create_user(username='admin', is_staff=True))
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+
+    def test_scrapers_need_the_bearer_token(self):
+        with self.settings(METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
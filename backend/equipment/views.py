@@ -1,27 +1,41 @@
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token as AuthToken
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Q
-from django.http import HttpResponse
-import pandas as pd
-import io
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from collections import Counter
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib import colors
+import hmac
 
-from equipment.models import Equipment, DataUpload, UserProfile
+from equipment.authentication import invalidate_cached_token
+from equipment.models import Equipment, DataUpload, UploadJob, UserProfile
+from equipment.exports import EXPORT_FORMATS, ExportError, stream_export
+from equipment.pagination import EquipmentCursorPagination, HistoryCursorPagination
+from equipment.jobs import get_executor, run_in_background
+from equipment.metrics import PROMETHEUS_CONTENT_TYPE, request_metrics
+from equipment.reports import (
+    REPORT_MODE_SUMMARY, REPORT_MODES, delete_cached_reports, get_or_render_report,
+    render_report_in_background
+)
+from equipment.cache import (
+    bump_data_version, cached_user_data, user_data_etag, user_data_last_modified
+)
+from equipment.ingest import IngestError, ingest_csv, refresh_upload_statistics
 from equipment.serializers import (
-    EquipmentSerializer, DataUploadSerializer, DataSummarySerializer, 
-    UploadCSVSerializer, UserSerializer
+    EquipmentSerializer, DataUploadSerializer, DataUploadIngestSerializer, DataSummarySerializer, 
+    UploadCSVSerializer, UploadJobSerializer, UserSerializer,
+    EquipmentReadSerializer, DataUploadReadSerializer
 )
 
 
@@ -93,20 +107,104 @@ class UserLogoutView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
+        key = request.user.auth_token.key
         request.user.auth_token.delete()
+        invalidate_cached_token(key)
         return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
 
 
-class EquipmentViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """List endpoint that serializes values() rows with a read serializer"""
+    read_serializer_class = None
+    
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.read_serializer_class
+        queryset = self.filter_queryset(self.get_queryset()).values(*serializer_class.value_fields())
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page, many=True).data)
+        
+        return Response(serializer_class(queryset, many=True).data)
+
+
+# Conditional GET support (ETag / Last-Modified) for per-user data endpoints
+conditional_user_data = condition(
+    etag_func=user_data_etag,
+    last_modified_func=user_data_last_modified
+)
+
+
+@method_decorator(conditional_user_data, name='list')
+@method_decorator(conditional_user_data, name='retrieve')
+class EquipmentViewSet(ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet for Equipment model"""
     queryset = Equipment.objects.all()
     serializer_class = EquipmentSerializer
+    read_serializer_class = EquipmentReadSerializer
     permission_classes = [IsAuthenticated]
     
+    pagination_class = EquipmentCursorPagination
+    
+    # Query parameter -> ORM lookup for numeric range filters
+    RANGE_FILTERS = {
+        'flowrate_min': 'flowrate__gte', 'flowrate_max': 'flowrate__lte',
+        'pressure_min': 'pressure__gte', 'pressure_max': 'pressure__lte',
+        'temperature_min': 'temperature__gte', 'temperature_max': 'temperature__lte',
+    }
+    
     def get_queryset(self):
-        """Return equipment for the current user only"""
+        """Return equipment for the current user only, with optional filters"""
         user = self.request.user
-        return Equipment.objects.filter(upload__user=user)
+        queryset = Equipment.objects.filter(upload__user=user)
+        params = self.request.query_params
+        
+        if params.get('upload'):
+            try:
+                queryset = queryset.filter(upload_id=int(params['upload']))
+            except ValueError:
+                raise ValidationError({'upload': 'Must be an integer upload id'})
+        
+        if params.get('equipment_type'):
+            queryset = queryset.filter(equipment_type__in=params['equipment_type'].split(','))
+        
+        for param, lookup in self.RANGE_FILTERS.items():
+            if params.get(param):
+                try:
+                    queryset = queryset.filter(**{lookup: float(params[param])})
+                except ValueError:
+                    raise ValidationError({param: 'Must be a number'})
+        
+        return queryset
+    
+    @transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self._refresh_uploads(serializer.instance.upload_id)
+    
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous_upload_id = serializer.instance.upload_id
+        super().perform_update(serializer)
+        self._refresh_uploads(previous_upload_id, serializer.instance.upload_id)
+    
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        upload_id = instance.upload_id
+        super().perform_destroy(instance)
+        self._refresh_uploads(upload_id)
+    
+    def _refresh_uploads(self, *upload_ids):
+        # Summary and history read the statistics stored on each upload, so
+        # recompute them for every upload whose rows changed
+        owners = {self.request.user.pk}
+        for upload in DataUpload.objects.filter(pk__in=set(upload_ids)):
+            refresh_upload_statistics(upload)
+            owners.add(upload.user_id)
+            transaction.on_commit(lambda upload_id=upload.pk: delete_cached_reports(upload_id))
+        
+        for user_id in owners:
+            transaction.on_commit(lambda user_id=user_id: bump_data_version(user_id))
 
 
 class UploadCSVView(generics.CreateAPIView):
@@ -122,66 +220,18 @@ class UploadCSVView(generics.CreateAPIView):
         csv_file = serializer.validated_data['file']
         
         try:
-            # Read CSV file
-            df = pd.read_csv(io.StringIO(csv_file.read().decode('utf-8')))
-            
-            # Validate required columns
-            required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-            if not all(col in df.columns for col in required_columns):
-                return Response(
-                    {'error': f'CSV must contain columns: {", ".join(required_columns)}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Clean column names
-            df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
-            
-            # Create DataUpload record
-            upload = DataUpload.objects.create(
-                user=request.user,
-                filename=csv_file.name,
-                total_records=len(df)
-            )
-            
-            # Process and save equipment data
-            for _, row in df.iterrows():
-                try:
-                    equipment_type = str(row['type']).lower().strip()
-                    # Map common type names
-                    type_mapping = {
-                        'pump': 'pump', 'compressor': 'compressor', 'reactor': 'reactor',
-                        'heat exchanger': 'heat_exchanger', 'separator': 'separator',
-                        'mixer': 'mixer', 'boiler': 'boiler', 'filter': 'filter'
-                    }
-                    equipment_type = type_mapping.get(equipment_type, 'other')
-                    
-                    Equipment.objects.create(
-                        upload=upload,
-                        equipment_name=str(row['equipment_name']).strip(),
-                        equipment_type=equipment_type,
-                        flowrate=float(row['flowrate']),
-                        pressure=float(row['pressure']),
-                        temperature=float(row['temperature'])
-                    )
-                except (ValueError, KeyError) as e:
-                    continue
+            # Stream, validate, clean and bulk insert equipment data,
+            # then apply the user's upload retention
+            try:
+                upload = ingest_csv(request.user, csv_file)
+            except IngestError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Calculate summary statistics
-            equipment_items = upload.equipment_items.all()
-            if equipment_items.exists():
-                upload.avg_flowrate = equipment_items.aggregate(Avg('flowrate'))['flowrate__avg'] or 0
-                upload.avg_pressure = equipment_items.aggregate(Avg('pressure'))['pressure__avg'] or 0
-                upload.avg_temperature = equipment_items.aggregate(Avg('temperature'))['temperature__avg'] or 0
-                upload.save()
-            
-            # Keep only last 5 uploads
-            old_uploads = DataUpload.objects.filter(user=request.user).order_by('-uploaded_at')[5:]
-            for old_upload in old_uploads:
-                old_upload.equipment_items.all().delete()
-                old_upload.delete()
+            # Pre-render the PDF report off the request path
+            run_in_background(render_report_in_background, upload.pk)
             
             return Response(
-                DataUploadSerializer(upload).data,
+                DataUploadIngestSerializer(upload).data,
                 status=status.HTTP_201_CREATED
             )
         
@@ -192,164 +242,181 @@ class UploadCSVView(generics.CreateAPIView):
             )
 
 
+class UploadJobCreateView(generics.CreateAPIView):
+    """API view for queueing a CSV upload for background processing"""
+    serializer_class = UploadCSVSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        csv_file = serializer.validated_data['file']
+        
+        # Spool the file to storage so it outlives the request
+        job = UploadJob(user=request.user, filename=csv_file.name, bytes_total=csv_file.size)
+        job.file.save(csv_file.name, csv_file, save=False)
+        job.save()
+        
+        get_executor().submit(job.pk)
+        
+        return Response(
+            UploadJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse('upload-job-detail', args=[job.pk])}
+        )
+
+
+class UploadJobDetailView(generics.RetrieveAPIView):
+    """API view for polling background upload job status"""
+    serializer_class = UploadJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return UploadJob.objects.filter(user=self.request.user).select_related('upload')
+
+
+@method_decorator(conditional_user_data, name='get')
 class DataSummaryView(generics.GenericAPIView):
     """API view for getting data summary"""
     permission_classes = [IsAuthenticated]
     serializer_class = DataSummarySerializer
     
     def get(self, request):
-        user = request.user
-        user_equipment = Equipment.objects.filter(upload__user=user)
+        return Response(cached_user_data(request, 'summary', lambda: self.build_summary(request.user)))
+    
+    def build_summary(self, user):
+        # Roll up the statistics stored on each upload instead of scanning
+        # the user's equipment rows; one query regardless of data volume.
+        uploads = list(
+            DataUpload.objects.filter(user=user).order_by('-uploaded_at')
+            .values(*DataUploadReadSerializer.value_fields())
+        )
+        total_count = sum(upload['equipment_count'] for upload in uploads)
         
-        if not user_equipment.exists():
-            return Response({
+        if not total_count:
+            return {
                 'total_count': 0,
                 'avg_flowrate': 0,
                 'avg_pressure': 0,
                 'avg_temperature': 0,
                 'equipment_type_distribution': {},
                 'recent_uploads': []
-            })
+            }
         
-        # Calculate statistics
-        total_count = user_equipment.count()
-        avg_flowrate = user_equipment.aggregate(Avg('flowrate'))['flowrate__avg'] or 0
-        avg_pressure = user_equipment.aggregate(Avg('pressure'))['pressure__avg'] or 0
-        avg_temperature = user_equipment.aggregate(Avg('temperature'))['temperature__avg'] or 0
+        # Count-weighted averages across uploads
+        def weighted_avg(field):
+            return sum(upload[field] * upload['equipment_count'] for upload in uploads) / total_count
         
         # Equipment type distribution
-        type_dist = user_equipment.values('equipment_type').annotate(count=Count('id'))
-        equipment_type_distribution = {item['equipment_type']: item['count'] for item in type_dist}
+        distribution = Counter()
+        for upload in uploads:
+            distribution.update(upload['equipment_distribution'])
         
-        # Recent uploads
-        recent_uploads = DataUpload.objects.filter(user=user).order_by('-uploaded_at')[:5]
-        
-        data = {
+        return {
             'total_count': total_count,
-            'avg_flowrate': round(avg_flowrate, 2),
-            'avg_pressure': round(avg_pressure, 2),
-            'avg_temperature': round(avg_temperature, 2),
-            'equipment_type_distribution': equipment_type_distribution,
-            'recent_uploads': DataUploadSerializer(recent_uploads, many=True).data
+            'avg_flowrate': round(weighted_avg('avg_flowrate'), 2),
+            'avg_pressure': round(weighted_avg('avg_pressure'), 2),
+            'avg_temperature': round(weighted_avg('avg_temperature'), 2),
+            'equipment_type_distribution': dict(sorted(distribution.items())),
+            'recent_uploads': DataUploadReadSerializer(uploads[:5], many=True).data
         }
-        
-        return Response(data)
 
 
-class HistoryListView(generics.ListAPIView):
+@method_decorator(conditional_user_data, name='get')
+class HistoryListView(ValuesListMixin, generics.ListAPIView):
     """API view for getting upload history"""
     serializer_class = DataUploadSerializer
+    read_serializer_class = DataUploadReadSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HistoryCursorPagination
     
     def get_queryset(self):
-        return DataUpload.objects.filter(user=self.request.user).order_by('-uploaded_at')[:5]
+        return DataUpload.objects.filter(user=self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        build = lambda: super(HistoryListView, self).list(request, *args, **kwargs).data
+        return Response(cached_user_data(request, 'history', build))
+
+
+class UploadExportView(generics.GenericAPIView):
+    """API view for streaming an upload's equipment rows as CSV, Parquet or Arrow"""
+    permission_classes = [IsAuthenticated]
+    
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= selects the export format here, not a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+    
+    def get(self, request, upload_id):
+        upload = get_object_or_404(DataUpload, id=upload_id, user=request.user)
+        fmt = request.query_params.get('format', 'csv')
+        
+        try:
+            content = stream_export(upload, fmt)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        content_type, extension = EXPORT_FORMATS[fmt]
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="upload_{upload.id}.{extension}"'
+        return response
 
 
 class GeneratePDFView(generics.GenericAPIView):
     """API view for generating PDF report"""
     permission_classes = [IsAuthenticated]
     
-    def get(self, request, upload_id=None):
+    def get(self, request, upload_id=None, mode=None):
         user = request.user
         
+        # 'summary' (default) previews the first rows, 'full' renders every row
+        mode = mode or request.query_params.get('mode') or REPORT_MODE_SUMMARY
+        if mode not in REPORT_MODES:
+            return Response(
+                {'error': f'mode must be one of: {", ".join(REPORT_MODES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         if upload_id:
             upload = get_object_or_404(DataUpload, id=upload_id, user=user)
         else:
             upload = DataUpload.objects.filter(user=user).latest('uploaded_at')
         
-        # Create PDF
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="report_{upload.id}_{datetime.now().strftime("%Y%m%d")}.pdf"'
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1f4788'),
-            spaceAfter=30,
-            alignment=1
+        # Reports never change once an upload is ingested, so serve the
+        # cached PDF from disk and only render on a miss
+        path = get_or_render_report(upload, mode)
+        
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=f'report_{upload.id}_{datetime.now().strftime("%Y%m%d")}.pdf',
+            content_type='application/pdf'
         )
-        elements.append(Paragraph('Chemical Equipment Analysis Report', title_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Header info
-        header_data = [
-            ['Report Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-            ['Upload File:', upload.filename],
-            ['Total Records:', str(upload.total_records)],
-        ]
-        header_table = Table(header_data, colWidths=[2*inch, 4*inch])
-        header_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Summary statistics
-        elements.append(Paragraph('Summary Statistics', styles['Heading2']))
-        summary_data = [
-            ['Metric', 'Value'],
-            ['Average Flowrate', f"{upload.avg_flowrate:.2f}"],
-            ['Average Pressure', f"{upload.avg_pressure:.2f}"],
-            ['Average Temperature', f"{upload.avg_temperature:.2f}"],
-        ]
-        summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Equipment list
-        elements.append(Paragraph('Equipment Details', styles['Heading2']))
-        equipment_items = upload.equipment_items.all()
-        eq_data = [['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']]
-        for eq in equipment_items[:20]:  # Limit to 20 items per page
-            eq_data.append([
-                eq.equipment_name,
-                eq.equipment_type,
-                f"{eq.flowrate:.2f}",
-                f"{eq.pressure:.2f}",
-                f"{eq.temperature:.2f}"
-            ])
-        
-        eq_table = Table(eq_data, colWidths=[1.5*inch, 1.2*inch, 1.1*inch, 1.1*inch, 1.1*inch])
-        eq_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
-        ]))
-        elements.append(eq_table)
-        
-        # Build PDF
-        doc.build(elements)
-        return response
     
     def post(self, request):
-        """Handle POST request with optional upload_id"""
+        """Handle POST request with optional upload_id and mode"""
         upload_id = request.data.get('upload_id')
-        return self.get(request, upload_id)
+        return self.get(request, upload_id, request.data.get('mode'))
+
+
+class MetricsView(generics.GenericAPIView):
+    """
+    API view exposing request metrics in Prometheus text format.
+
+    Served to scrapers sending METRICS_TOKEN as a bearer token and to staff
+    users; without a configured token the endpoint is hidden from everyone else.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        authorized = request.user.is_staff or (bool(token) and hmac.compare_digest(
+            request.headers.get('Authorization', ''), f'Bearer {token}'
+        ))
+        if not authorized:
+            if not token:
+                return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'error': 'Invalid metrics token'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        return HttpResponse(request_metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,20 +1,119 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_BASE_URL = os.environ.get('CEV_API_BASE_URL', 'http://localhost:8000/api')
+SUMMARY_URL = f'{API_BASE_URL}/summary/'
+HISTORY_URL = f'{API_BASE_URL}/history/'
+
+# (connect, read) timeouts in seconds; uploads get a longer read timeout
+CONNECT_TIMEOUT = float(os.environ.get('CEV_API_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('CEV_API_READ_TIMEOUT', 30))
+UPLOAD_TIMEOUT = float(os.environ.get('CEV_API_UPLOAD_TIMEOUT', 300))
+
+# Keep-alive connections kept open to the backend, shared by all threads
+POOL_SIZE = int(os.environ.get('CEV_API_POOL_SIZE', 8))
+
+# Connection errors are retried for every request; 502/503/504 responses
+# and read errors only for idempotent methods (not uploads or logins)
+RETRIES = int(os.environ.get('CEV_API_RETRIES', 3))
+RETRY_BACKOFF = float(os.environ.get('CEV_API_RETRY_BACKOFF', 0.5))
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Last 200 response per (token, url), shared by every APIClient so that
+# short-lived worker clients can revalidate with If-None-Match.
+_etag_cache = {}
+_etag_lock = threading.Lock()
+
+
+def _get_adapter():
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False,
+            )
+            _adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+        return _adapter
+
+
+def get_session():
+    """Return this thread's requests.Session.
+
+    Sessions are not safe to share between threads, but they all mount the
+    same adapter, whose urllib3 pool is; so every thread and every
+    APIClient reuses the same keep-alive connections.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = _get_adapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+
+def run_concurrently(*calls):
+    """Run independent zero-argument calls in parallel; return their results in order.
+
+    The first exception raised by any call is re-raised once all calls finish.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='api')
+    futures = [_executor.submit(call) for call in calls]
+    results = []
+    error = None
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as exc:
+            results.append(None)
+            error = error or exc
+    if error is not None:
+        raise error
+    return results
 
 
 class APIClient:
     """Client for API communication."""
 
-    def __init__(self, token=None):
+    def __init__(self, token=None, timeout=None, cache=None):
         self.token = token
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        # Optional offline_cache.ResponseCache backing conditional GETs on disk
+        self.cache = cache
         self.headers = {'Content-Type': 'application/json'}
         if token:
             self.headers['Authorization'] = f'Token {token}'
 
+    def _get(self, url, **kwargs):
+        kwargs.setdefault('headers', self.headers)
+        kwargs.setdefault('timeout', self.timeout)
+        return get_session().get(url, **kwargs)
+
+    def _post(self, url, **kwargs):
+        kwargs.setdefault('headers', self.headers)
+        kwargs.setdefault('timeout', self.timeout)
+        return get_session().post(url, **kwargs)
+
     def register(self, username, email, password, first_name='', last_name=''):
-        return requests.post(
+        return self._post(
             f'{API_BASE_URL}/auth/register/',
             json={
                 'username': username,
@@ -23,38 +122,82 @@ class APIClient:
                 'first_name': first_name,
                 'last_name': last_name,
             },
-            headers=self.headers,
         )
 
     def login(self, username, password):
-        return requests.post(
+        return self._post(
             f'{API_BASE_URL}/auth/login/',
             json={'username': username, 'password': password},
-            headers=self.headers,
         )
 
     def logout(self):
-        return requests.post(f'{API_BASE_URL}/auth/logout/', headers=self.headers)
+        return self._post(f'{API_BASE_URL}/auth/logout/')
 
     def upload_csv(self, file_path):
         with open(file_path, 'rb') as f:
             files = {'file': f}
-            return requests.post(
+            return self._post(
                 f'{API_BASE_URL}/upload-csv/',
                 files=files,
                 headers={'Authorization': f'Token {self.token}'},
+                timeout=(self.timeout[0], UPLOAD_TIMEOUT),
+            )
+
+    def create_upload_job(self, file_path):
+        with open(file_path, 'rb') as f:
+            files = {'file': f}
+            return self._post(
+                f'{API_BASE_URL}/upload-jobs/',
+                files=files,
+                headers={'Authorization': f'Token {self.token}'},
+                timeout=(self.timeout[0], UPLOAD_TIMEOUT),
             )
 
+    def get_upload_job(self, job_id):
+        return self._get(f'{API_BASE_URL}/upload-jobs/{job_id}/')
+
+    def _conditional_get(self, url):
+        """GET with If-None-Match; a 304 returns the previously cached response.
+
+        Responses are looked up in memory first, then in the offline cache.
+        """
+        key = (self.token, url)
+        with _etag_lock:
+            cached = _etag_cache.get(key)
+        from_disk = cached is None and self.cache is not None
+        if from_disk:
+            cached = self.cache.get_response(url)
+
+        headers = dict(self.headers)
+        if cached is not None:
+            headers['If-None-Match'] = cached.headers['ETag']
+
+        response = self._get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            if self.cache is not None:
+                self.cache.touch(url)
+            if from_disk:
+                with _etag_lock:
+                    _etag_cache[key] = cached
+            return cached
+        if response.status_code == 200 and 'ETag' in response.headers:
+            with _etag_lock:
+                _etag_cache[key] = response
+            if self.cache is not None:
+                self.cache.put(url, response.headers['ETag'], response.content)
+        return response
+
     def get_summary(self):
-        return requests.get(f'{API_BASE_URL}/summary/', headers=self.headers)
+        return self._conditional_get(SUMMARY_URL)
+
+    def get_history(self, url=None):
+        """Fetch a history page; url is a previous page's next link (first page by default)."""
+        return self._conditional_get(url or HISTORY_URL)
 
-    def get_history(self):
-        return requests.get(f'{API_BASE_URL}/history/', headers=self.headers)
+    def get_summary_and_history(self):
+        """Fetch summary and history concurrently; returns (summary, history) responses."""
+        return tuple(run_concurrently(self.get_summary, self.get_history))
 
     def generate_pdf(self, upload_id=None):
         data = {'upload_id': upload_id} if upload_id else {}
-        return requests.post(
-            f'{API_BASE_URL}/generate-pdf/',
-            json=data,
-            headers=self.headers,
-        )
+        return self._post(f'{API_BASE_URL}/generate-pdf/', json=data)
@@ -1,30 +1,73 @@
+import math
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import numpy as np
+from PyQt5.QtCore import QSize, QTimer
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QWidget
 
+from workers import ChartRenderWorker
 
-class MatplotlibCanvas(FigureCanvas):
-    """Matplotlib canvas styled for Dark Slate UI."""
 
-    def __init__(self, parent=None, chart_type="bar"):
-        # Dark slate background #1e293b to match card background
-        self.figure = Figure(figsize=(7, 4), dpi=100)
-        self.figure.patch.set_facecolor("#1e293b")
+BACKGROUND = "#1e293b"
+
+# High contrast neon palette
+COLORS = [
+    "#818cf8", # Indigo 400
+    "#a78bfa", # Violet 400
+    "#f472b6", # Pink 400
+    "#34d399", # Emerald 400
+    "#60a5fa", # Blue 400
+    "#fbbf24", # Amber 400
+    "#f87171", # Red 400
+]
+
+# Wedge geometry shared by pie and doughnut charts
+PIE_START_ANGLE = 90
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.75
+
+
+class ChartPainter:
+    """Draws the Dark Slate charts onto a Figure, independent of any Qt widget.
+
+    Artists are built once per chart layout (the set of categories, or
+    whether there is any data) and later refreshes only update their data,
+    so redraw cost does not grow with the number of refreshes. The plot
+    methods return False when the data is unchanged and nothing needs
+    redrawing.
+    """
+
+    def __init__(self, figure, chart_type="bar"):
+        self.figure = figure
+        self.figure.patch.set_facecolor(BACKGROUND)
         self.axes = self.figure.add_subplot(111)
         self.chart_type = chart_type
 
-        super().__init__(self.figure)
-        self.setParent(parent)
-        
-        self.setStyleSheet("background-color: transparent;")
-
         # Adjusted margins for visibility (Left for Y-axis label, Bottom for rotated X-axis)
         self.figure.subplots_adjust(left=0.18, right=0.92, top=0.88, bottom=0.32)
 
+        self._twin = None
+        self._layout = None
+        self._data = None
+        self._artists = {}
+
     # ================= Common =================
+    def _reset(self, layout):
+        self.axes.clear()
+        self._base_style()
+        if self._twin is not None:
+            for line in self._twin.lines[:]:
+                line.remove()
+            self._twin.set_visible(False)
+        self._artists = {}
+        self._layout = layout
+
     def _base_style(self):
-        self.axes.set_facecolor("#1e293b")
-        
+        self.axes.set_facecolor(BACKGROUND)
+
         for spine in ["top", "right"]:
             self.axes.spines[spine].set_visible(False)
 
@@ -38,38 +81,62 @@ class MatplotlibCanvas(FigureCanvas):
         self.axes.grid(axis="y", linestyle="--", linewidth=0.8, alpha=0.1, color="#ffffff")
         self.axes.set_axisbelow(True)
 
+    def _twin_axes(self):
+        # Created once and reused; twinx() on every refresh leaks axes
+        if self._twin is None:
+            self._twin = self.axes.twinx()
+            self._twin.spines["top"].set_visible(False)
+            self._twin.spines["left"].set_visible(False)
+            self._twin.spines["bottom"].set_visible(False)
+            self._twin.spines["right"].set_color("#475569")
+            self._twin.spines["right"].set_linewidth(1.2)
+            self._twin.tick_params(axis="y", colors="#cbd5e1", labelsize=9)
+        self._twin.set_visible(True)
+        return self._twin
+
+    def _empty(self, message):
+        self.axes.text(
+            0.5,
+            0.5,
+            message,
+            ha="center",
+            va="center",
+            fontsize=11,
+            color="#64748b",
+            transform=self.axes.transAxes,
+        )
+
+    def _rescale(self, axes):
+        axes.relim()
+        axes.autoscale_view()
+
     # ================= Distribution =================
     def plot_equipment_distribution(self, distribution):
-        self.axes.clear()
-        self._base_style()
-
-        if not distribution:
-            self.axes.text(
-                0.5,
-                0.5,
-                "No data available",
-                ha="center",
-                va="center",
-                fontsize=11,
-                color="#64748b",
-                transform=self.axes.transAxes,
-            )
-            self.draw()
-            return
+        if distribution == self._data:
+            return False
+        self._data = distribution
 
         labels = list(distribution.keys())
         values = list(distribution.values())
-        # High contrast neon palette
-        colors = [
-            "#818cf8", # Indigo 400
-            "#a78bfa", # Violet 400
-            "#f472b6", # Pink 400
-            "#34d399", # Emerald 400
-            "#60a5fa", # Blue 400
-            "#fbbf24", # Amber 400
-            "#f87171", # Red 400
-        ]
+        layout = ("distribution", tuple(labels))
 
+        if not distribution:
+            self._reset(layout)
+            self._empty("No data available")
+            return True
+
+        if layout == self._layout:
+            update = {
+                "bar": self._update_bar,
+                "pie": self._update_pie,
+                "doughnut": self._update_pie,
+                "line": self._update_line,
+            }[self.chart_type]
+            update(values)
+            return True
+
+        self._reset(layout)
+        colors = COLORS[: len(labels)]
         if self.chart_type == "bar":
             self._bar(labels, values, colors)
         elif self.chart_type == "pie":
@@ -77,97 +144,128 @@ class MatplotlibCanvas(FigureCanvas):
         elif self.chart_type == "doughnut":
             self._doughnut(labels, values, colors)
         elif self.chart_type == "line":
-            self._line(labels, values, colors)
-
-        self.draw()
+            self._line(labels, values, COLORS)
+        return True
 
     # ================= Bar =================
     def _bar(self, labels, values, colors):
         bars = self.axes.bar(
             labels,
             values,
-            color=colors[: len(labels)],
-            edgecolor="#1e293b",
+            color=colors,
+            edgecolor=BACKGROUND,
             linewidth=1.0,
         )
 
-        for bar in bars:
-            h = bar.get_height()
+        texts = [
             self.axes.text(
                 bar.get_x() + bar.get_width() / 2,
-                h + 0.1,
-                f"{int(h)}",
+                bar.get_height() + 0.1,
+                f"{int(bar.get_height())}",
                 ha="center",
                 va="bottom",
                 fontsize=9,
                 fontweight="bold",
                 color="#f1f5f9",
             )
+            for bar in bars
+        ]
+        self._artists = {"bars": list(bars), "texts": texts}
 
         self.axes.set_ylabel("Count", fontsize=10, fontweight="bold", color="#f1f5f9")
-        
+
         # Rotate x labels with better alignment
         self.figure.autofmt_xdate(rotation=30, ha="right")
 
+    def _update_bar(self, values):
+        for bar, text, value in zip(self._artists["bars"], self._artists["texts"], values):
+            bar.set_height(value)
+            text.set_y(value + 0.1)
+            text.set_text(f"{int(value)}")
+        self._rescale(self.axes)
+
     # ================= Pie =================
     def _pie(self, labels, values, colors):
         wedges, texts, autotexts = self.axes.pie(
             values,
             labels=labels,
-            colors=colors[: len(labels)],
+            colors=colors,
             autopct="%1.0f%%",
-            startangle=90,
+            startangle=PIE_START_ANGLE,
             textprops={"fontsize": 9, "color": "#f1f5f9"},
-            wedgeprops={"edgecolor": "#1e293b", "linewidth": 2},
-            pctdistance=0.75,
-            labeldistance=1.1
+            wedgeprops={"edgecolor": BACKGROUND, "linewidth": 2},
+            pctdistance=PIE_PCT_DISTANCE,
+            labeldistance=PIE_LABEL_DISTANCE
         )
-        # Ensure labels are visible
-        for t in texts:
-            t.set_color("#f1f5f9")
-        for at in autotexts:
-            at.set_color("#1e293b")
-            at.set_fontweight("bold")
+        self._style_pie(wedges, texts, autotexts)
 
     # ================= Doughnut =================
     def _doughnut(self, labels, values, colors):
         wedges, texts, autotexts = self.axes.pie(
             values,
             labels=labels,
-            colors=colors[: len(labels)],
+            colors=colors,
             autopct="%1.0f%%",
-            startangle=90,
+            startangle=PIE_START_ANGLE,
             textprops={"fontsize": 9, "color": "#f1f5f9"},
             wedgeprops={
                 "width": 0.5,
-                "edgecolor": "#1e293b",
+                "edgecolor": BACKGROUND,
                 "linewidth": 2,
             },
-            pctdistance=0.75,
-            labeldistance=1.1
+            pctdistance=PIE_PCT_DISTANCE,
+            labeldistance=PIE_LABEL_DISTANCE
         )
+        self._style_pie(wedges, texts, autotexts)
+
+    def _style_pie(self, wedges, texts, autotexts):
+        # Ensure labels are visible
         for t in texts:
             t.set_color("#f1f5f9")
         for at in autotexts:
-            at.set_color("#1e293b")
+            at.set_color(BACKGROUND)
             at.set_fontweight("bold")
+        self._artists = {"wedges": wedges, "texts": texts, "autotexts": autotexts}
+
+    def _update_pie(self, values):
+        # Same wedge geometry as Axes.pie(), applied to the existing artists
+        total = float(sum(values)) or 1.0
+        theta1 = PIE_START_ANGLE / 360.0
+        artists = zip(self._artists["wedges"], self._artists["texts"], self._artists["autotexts"], values)
+        for wedge, text, autotext, value in artists:
+            frac = value / total
+            theta2 = theta1 + frac
+            wedge.set_theta1(360.0 * theta1)
+            wedge.set_theta2(360.0 * theta2)
+
+            thetam = math.pi * (theta1 + theta2)
+            radius = wedge.r
+            x = PIE_LABEL_DISTANCE * radius * math.cos(thetam)
+            text.set_position((x, PIE_LABEL_DISTANCE * radius * math.sin(thetam)))
+            text.set_horizontalalignment("left" if x > 0 else "right")
+            autotext.set_position((
+                PIE_PCT_DISTANCE * radius * math.cos(thetam),
+                PIE_PCT_DISTANCE * radius * math.sin(thetam),
+            ))
+            autotext.set_text("%1.0f%%" % (100.0 * frac))
+            theta1 = theta2
 
     # ================= Line =================
     def _line(self, labels, values, colors):
         x = np.arange(len(labels))
 
-        self.axes.plot(
+        line, = self.axes.plot(
             x,
             values,
             marker="o",
             linewidth=2.5,
             color=colors[0],
-            markerfacecolor="#1e293b",
+            markerfacecolor=BACKGROUND,
             markeredgecolor=colors[0],
             markeredgewidth=2,
         )
 
-        for i, val in enumerate(values):
+        texts = [
             self.axes.text(
                 i,
                 val + 0.2,
@@ -178,29 +276,31 @@ class MatplotlibCanvas(FigureCanvas):
                 fontweight="bold",
                 color="#f1f5f9",
             )
+            for i, val in enumerate(values)
+        ]
+        self._artists = {"line": line, "texts": texts}
 
         self.axes.set_xticks(x)
         self.axes.set_xticklabels(labels, rotation=30, ha="right")
         self.axes.set_ylabel("Count", fontsize=10, fontweight="bold", color="#f1f5f9")
 
+    def _update_line(self, values):
+        self._artists["line"].set_ydata(values)
+        for text, value in zip(self._artists["texts"], values):
+            text.set_y(value + 0.2)
+            text.set_text(f"{int(value)}")
+        self._rescale(self.axes)
+
     # ================= Upload Trends =================
     def plot_upload_trends(self, uploads):
-        self.axes.clear()
-        self._base_style()
+        if uploads == self._data:
+            return False
+        self._data = uploads
 
         if not uploads:
-            self.axes.text(
-                0.5,
-                0.5,
-                "No upload history",
-                ha="center",
-                va="center",
-                fontsize=11,
-                color="#64748b",
-                transform=self.axes.transAxes,
-            )
-            self.draw()
-            return
+            self._reset(("trends", False))
+            self._empty("No upload history")
+            return True
 
         uploads = sorted(uploads, key=lambda x: x.get("uploaded_at", ""))
         x = np.arange(len(uploads))
@@ -210,39 +310,200 @@ class MatplotlibCanvas(FigureCanvas):
         press = [u.get("avg_pressure", 0) for u in uploads]
         temp = [u.get("avg_temperature", 0) for u in uploads]
 
-        ax2 = self.axes.twinx()
-        ax2.spines["top"].set_visible(False)
-        ax2.spines["left"].set_visible(False)
-        ax2.spines["bottom"].set_visible(False)
-        ax2.spines["right"].set_color("#475569") 
-        ax2.spines["right"].set_linewidth(1.2)
-        ax2.tick_params(axis="y", colors="#cbd5e1", labelsize=9)
-
-        # Plot Lines
-        self.axes.plot(x, flow, marker="o", linewidth=2.5, label="Flowrate", color="#818cf8")
-        self.axes.plot(x, temp, marker="^", linewidth=2.5, label="Temperature", color="#f472b6")
-        ax2.plot(x, press, marker="s", linewidth=2.5, label="Pressure", color="#34d399")
+        ax2 = self._twin_axes()
+
+        if self._layout == ("trends", True):
+            self._artists["flow"].set_data(x, flow)
+            self._artists["temp"].set_data(x, temp)
+            self._artists["press"].set_data(x, press)
+            self._rescale(self.axes)
+            self._rescale(ax2)
+        else:
+            self._reset(("trends", True))
+            ax2 = self._twin_axes()
+
+            # Plot Lines
+            flow_line, = self.axes.plot(x, flow, marker="o", linewidth=2.5, label="Flowrate", color="#818cf8")
+            temp_line, = self.axes.plot(x, temp, marker="^", linewidth=2.5, label="Temperature", color="#f472b6")
+            press_line, = ax2.plot(x, press, marker="s", linewidth=2.5, label="Pressure", color="#34d399")
+            self._artists = {"flow": flow_line, "temp": temp_line, "press": press_line}
+
+            self.axes.set_xlabel("Upload Sequence", fontsize=10, fontweight="bold", color="#f1f5f9")
+            self.axes.set_ylabel("Flowrate / Temperature", fontsize=10, fontweight="bold", color="#f1f5f9")
+            ax2.set_ylabel("Pressure", fontsize=10, fontweight="bold", color="#f1f5f9")
+
+            # Legend
+            lines, labels_ = self.axes.get_legend_handles_labels()
+            lines2, labels2 = ax2.get_legend_handles_labels()
+            self.axes.legend(
+                lines + lines2,
+                labels_ + labels2,
+                loc="upper left",
+                fontsize=9,
+                frameon=True,
+                facecolor=BACKGROUND,
+                edgecolor="#334155",
+                labelcolor="#f1f5f9",
+                fancybox=True
+            )
 
         self.axes.set_xticks(x)
         self.axes.set_xticklabels(labels)
-        self.axes.set_xlabel("Upload Sequence", fontsize=10, fontweight="bold", color="#f1f5f9")
-
-        self.axes.set_ylabel("Flowrate / Temperature", fontsize=10, fontweight="bold", color="#f1f5f9")
-        ax2.set_ylabel("Pressure", fontsize=10, fontweight="bold", color="#f1f5f9")
-
-        # Legend
-        lines, labels_ = self.axes.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        leg = self.axes.legend(
-            lines + lines2,
-            labels_ + labels2,
-            loc="upper left",
-            fontsize=9,
-            frameon=True,
-            facecolor="#1e293b",
-            edgecolor="#334155",
-            labelcolor="#f1f5f9",
-            fancybox=True
-        )
+        return True
+
+
+def rasterize(painter, width, height, device_pixel_ratio=1.0):
+    """Render a painter's figure with Agg and return it as a QImage.
+
+    Touches no widgets, so it may run on a worker thread as long as no
+    other thread uses the same painter at the same time.
+    """
+    figure = painter.figure
+    figure.set_dpi(100 * device_pixel_ratio)
+    figure.set_size_inches(max(width, 1) / 100, max(height, 1) / 100)
+
+    canvas = figure.canvas if isinstance(figure.canvas, FigureCanvasAgg) else FigureCanvasAgg(figure)
+    canvas.draw()
+    buffer = canvas.buffer_rgba()
+    image = QImage(buffer, buffer.shape[1], buffer.shape[0], QImage.Format_RGBA8888).copy()
+    image.setDevicePixelRatio(device_pixel_ratio)
+    return image
+
+
+class MatplotlibCanvas(FigureCanvas):
+    """Matplotlib canvas styled for Dark Slate UI.
+
+    Redraws are scheduled with draw_idle(), and while the canvas is hidden
+    (e.g. on an inactive tab) only the latest data is kept and drawn once
+    the canvas is shown.
+    """
+
+    def __init__(self, parent=None, chart_type="bar"):
+        # Dark slate background #1e293b to match card background
+        self.figure = Figure(figsize=(7, 4), dpi=100)
+        self.painter = ChartPainter(self.figure, chart_type)
+        self.axes = self.painter.axes
+        self.chart_type = chart_type
+
+        super().__init__(self.figure)
+        self.setParent(parent)
+
+        self.setStyleSheet("background-color: transparent;")
 
-        self.draw()
+        self._pending = None
+
+    def plot_equipment_distribution(self, distribution):
+        self._plot(self.painter.plot_equipment_distribution, distribution)
+
+    def plot_upload_trends(self, uploads):
+        self._plot(self.painter.plot_upload_trends, uploads)
+
+    def _plot(self, plot, data):
+        if not self.isVisible():
+            self._pending = (plot, data)
+            return
+        self._pending = None
+        if plot(data):
+            self.draw_idle()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._pending is not None:
+            self._plot(*self._pending)
+
+
+class ChartImage(QWidget):
+    """Chart widget whose figure is rasterized off the GUI thread.
+
+    Offers the same plot methods as MatplotlibCanvas, but the Agg render
+    runs in a ChartRenderWorker and the widget only paints the resulting
+    QImage. One render is in flight at a time; newer data or a resize
+    during a render triggers one follow-up render with the latest state.
+    """
+
+    def __init__(self, parent=None, chart_type="bar", width=700, height=300):
+        super().__init__(parent)
+        self.chart_type = chart_type
+        self.painter = ChartPainter(Figure(figsize=(width / 100, height / 100), dpi=100), chart_type)
+        self._size_hint = QSize(width, height)
+
+        self._request = None
+        self._image = None
+        self._worker = None
+        self._stale = False
+
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(100)
+        self._resize_timer.timeout.connect(self._render)
+
+    def sizeHint(self):
+        return self._size_hint
+
+    def plot_equipment_distribution(self, distribution):
+        self._set_request(self.painter.plot_equipment_distribution, distribution)
+
+    def plot_upload_trends(self, uploads):
+        self._set_request(self.painter.plot_upload_trends, uploads)
+
+    def stop(self):
+        self._resize_timer.stop()
+        if self._worker is not None:
+            self._worker.wait()
+
+    def _set_request(self, plot, data):
+        self._request = (plot, data)
+        self._render()
+
+    def _render(self):
+        if self._request is None:
+            return
+        if self._worker is not None or not self.isVisible():
+            self._stale = True
+            return
+        self._stale = False
+
+        plot, data = self._request
+        width, height, ratio = self.width(), self.height(), self.devicePixelRatioF()
+
+        def render():
+            plot(data)
+            return rasterize(self.painter, width, height, ratio)
+
+        worker = ChartRenderWorker(render)
+        worker.finished.connect(self._on_rendered)
+        worker.error.connect(self._on_render_error)
+        self._worker = worker
+        worker.start()
+
+    def _on_rendered(self, image):
+        self._image = image
+        self.update()
+        self._on_done()
+
+    def _on_render_error(self, message):
+        print("Chart render error:", message)
+        self._on_done()
+
+    def _on_done(self):
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.wait()
+        if self._stale:
+            self._render()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(BACKGROUND))
+        if self._image is not None:
+            painter.drawImage(self.rect(), self._image)
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._resize_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self._render()
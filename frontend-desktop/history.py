@@ -0,0 +1,179 @@
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+from workers import HistoryPageWorker
+
+
+# (header, upload field) per column; the action column has no field
+COLUMNS = [
+    ("Filename", "filename"),
+    ("Records", "total_records"),
+    ("Flowrate", "avg_flowrate"),
+    ("Pressure", "avg_pressure"),
+    ("Temp", "avg_temperature"),
+    ("Action", None),
+]
+ACTION_COLUMN = 5
+FLOAT_FIELDS = {"avg_flowrate", "avg_pressure", "avg_temperature"}
+
+# Raw values, so numeric columns sort numerically
+SORT_ROLE = Qt.UserRole
+UPLOAD_ID_ROLE = Qt.UserRole + 1
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Upload history, loaded page by page from the /history/ endpoint.
+
+    The first page comes from the dashboard refresh. Further pages are
+    fetched on a HistoryPageWorker when the view scrolls near the end
+    (Qt's canFetchMore/fetchMore protocol) and appended to the model, so
+    only rows the user actually reaches are downloaded.
+    """
+
+    def __init__(self, token, parent=None, cache=None):
+        super().__init__(parent)
+        self.token = token
+        self.cache = cache
+        self._rows = []
+        self._next_url = ""
+        self._fetching = False
+        # Bumped on every reset so pages requested before it are dropped
+        self._generation = 0
+        self._workers = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+        field = COLUMNS[index.column()][1]
+
+        if role == Qt.DisplayRole:
+            if field is None:
+                return "PDF"
+            if field in FLOAT_FIELDS:
+                return f"{row.get(field, 0):.2f}"
+            return str(row.get(field, ""))
+        if role == SORT_ROLE:
+            return row.get(field) if field else None
+        if role == UPLOAD_ID_ROLE:
+            return row.get("id")
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def set_first_page(self, rows, next_url):
+        """Replace all rows with a freshly fetched first page."""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._next_url = next_url
+        self._fetching = False
+        self._generation += 1
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self._next_url) and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        generation = self._generation
+        worker = HistoryPageWorker(self.token, self._next_url, self.cache)
+        worker.finished.connect(lambda rows, next_url: self._on_page(worker, generation, rows, next_url))
+        worker.error.connect(lambda message: self._on_page_error(worker, generation, message))
+        self._workers.add(worker)
+        self._fetching = True
+        worker.start()
+
+    def stop(self):
+        for worker in list(self._workers):
+            worker.wait()
+
+    def _on_page(self, worker, generation, rows, next_url):
+        self._release(worker)
+        if generation != self._generation:
+            return
+
+        self._fetching = False
+        self._next_url = next_url
+        if rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def _on_page_error(self, worker, generation, message):
+        self._release(worker)
+        print("History page error:", message)
+        if generation == self._generation:
+            self._fetching = False
+
+    def _release(self, worker):
+        worker.wait()
+        self._workers.discard(worker)
+
+
+class PdfButtonDelegate(QStyledItemDelegate):
+    """Paints the PDF action as a button and reports clicks, without a widget per row."""
+
+    clicked = pyqtSignal(object)
+
+    BUTTON_WIDTH = 60
+    BUTTON_HEIGHT = 30
+
+    def _button_rect(self, rect):
+        return QRect(
+            rect.center().x() - self.BUTTON_WIDTH // 2,
+            rect.center().y() - self.BUTTON_HEIGHT // 2,
+            self.BUTTON_WIDTH,
+            self.BUTTON_HEIGHT,
+        )
+
+    def paint(self, painter, option, index):
+        # Let the style draw the row background (stripes, selection) without text
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        # Use Primary Accent Color (Indigo) for button background, White text
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        button = self._button_rect(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#4f46e5" if hovered else "#6366f1"))
+        painter.drawRoundedRect(button, 6, 6)
+
+        font = QFont(option.font)
+        font.setBold(True)
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(button, Qt.AlignCenter, index.data(Qt.DisplayRole))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self._button_rect(option.rect).contains(event.pos())
+        ):
+            self.clicked.emit(index.data(UPLOAD_ID_ROLE))
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -7,21 +7,22 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QFileDialog,
     QTabWidget,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QMessageBox,
     QProgressBar,
     QFrame,
     QScrollArea,
     QLineEdit,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QSortFilterProxyModel, Qt
 from PyQt5.QtGui import QColor, QIcon, QPixmap
 
 from api import APIClient
-from charts import MatplotlibCanvas
+from charts import ChartImage, MatplotlibCanvas
+from history import ACTION_COLUMN, SORT_ROLE, HistoryTableModel, PdfButtonDelegate
+from offline_cache import get_response_cache
 from styles import STYLESHEET, StyleHelper
-from workers import SummaryWorker, UploadWorker
+from workers import RefreshCoordinator, UploadWorker
 
 
 class MainWindow(QMainWindow):
@@ -29,16 +30,27 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.token = token
         self.user = user
-        self.client = APIClient(token)
+        # Last summary/history on disk, so startup does not wait for the server
+        self.cache = get_response_cache(user.get('username'))
+        self.client = APIClient(token, cache=self.cache)
         self.summary_data = None
         self._workers = []  # Track running QThreads
 
+        # Summary and history are always reloaded together, off the GUI thread
+        self.refresher = RefreshCoordinator(token, self, cache=self.cache)
+        self.refresher.summary_loaded.connect(self.on_summary_loaded)
+        self.refresher.summary_loaded.connect(self.update_charts)
+        self.refresher.history_loaded.connect(self.update_history_table)
+        self.refresher.error.connect(lambda message: print("Refresh error:", message))
+
         self.init_ui()
         self.setStyleSheet(STYLESHEET)
         
         # Apply palette for elements not covered by stylesheet
         StyleHelper.set_dark_palette(self)
         
+        # Paint the cached data first, then revalidate it in the background
+        self.refresher.load_cached()
         self.load_all_data()
 
     # ================= Window =================
@@ -276,8 +288,8 @@ class MainWindow(QMainWindow):
         cc_title.setObjectName("sectionTitle")
         cc_layout.addWidget(cc_title)
         
-        self.mini_chart = MatplotlibCanvas(widget, "doughnut")
-        self.mini_chart.figure.set_figheight(3)
+        # Preview thumbnail, rasterized on a worker thread
+        self.mini_chart = ChartImage(widget, "doughnut", height=300)
         cc_layout.addWidget(self.mini_chart)
         
         lower_row.addWidget(chart_card, 2)
@@ -465,28 +477,44 @@ class MainWindow(QMainWindow):
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
 
-        # Table
-        self.history_table = QTableWidget(0, 6)
-        self.history_table.setHorizontalHeaderLabels(
-            ["Filename", "Records", "Flowrate", "Pressure", "Temp", "Action"]
-        )
+        # Table: model/view, so only visible rows are painted
+        self.history_model = HistoryTableModel(self.token, self, cache=self.cache)
+        self.history_proxy = QSortFilterProxyModel(self)
+        self.history_proxy.setSourceModel(self.history_model)
+        self.history_proxy.setFilterKeyColumn(0) # Filename is column 0
+        self.history_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.history_proxy.setSortRole(SORT_ROLE)
+
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_proxy)
         self.history_table.verticalHeader().setVisible(False)
         self.history_table.setShowGrid(False)
         self.history_table.setAlternatingRowColors(True)
         self.history_table.setSortingEnabled(True) # Enable sorting
-        
+        self.history_table.sortByColumn(-1, Qt.AscendingOrder) # Keep server order until a header is clicked
+        self.history_table.setMouseTracking(True) # Hover state for the PDF buttons
+
+        # PDF buttons are painted by a delegate instead of a widget per row
+        pdf_delegate = PdfButtonDelegate(self.history_table)
+        pdf_delegate.clicked.connect(self.generate_pdf)
+        self.history_table.setItemDelegateForColumn(ACTION_COLUMN, pdf_delegate)
+
         # Improve layout behavior
         from PyQt5.QtWidgets import QHeaderView
         header = self.history_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch) # Filename takes available space
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.Fixed)
-        header.resizeSection(5, 100) # Fixed width for action btn
-        
-        self.history_table.setSelectionBehavior(QTableWidget.SelectRows)
+        # Fixed widths: ResizeToContents would measure rows on every page load
+        for column in range(1, 6):
+            header.setSectionResizeMode(column, QHeaderView.Fixed)
+            header.resizeSection(column, 120)
+        header.resizeSection(ACTION_COLUMN, 100) # Fixed width for action btn
+
+        # Uniform row height keeps scrolling independent of row count
+        rows = self.history_table.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(60)
+
+        self.history_table.setSelectionBehavior(QTableView.SelectRows)
         self.history_table.setFocusPolicy(Qt.NoFocus)
 
         layout.addWidget(self.history_table)
@@ -505,8 +533,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Select a CSV file first")
             return
 
+        self.upload_progress.setRange(0, 100)
+        self.upload_progress.setValue(0)
         self.upload_progress.setVisible(True)
         worker = UploadWorker(self.file_path, self.token)
+        worker.progress.connect(self.upload_progress.setValue)
         worker.finished.connect(lambda _: self.load_all_data())
         worker.finished.connect(lambda _: self._cleanup_worker(worker))
         worker.error.connect(lambda _: self._cleanup_worker(worker))
@@ -514,126 +545,28 @@ class MainWindow(QMainWindow):
         worker.start()
 
     def load_all_data(self):
-        self.load_summary()
-        self.load_chart_data()
-        self.load_history()
+        self.refresher.request_refresh()
 
-    def load_summary(self):
-        worker = SummaryWorker(self.token)
-        worker.finished.connect(self.on_summary_loaded)
-        worker.finished.connect(lambda _: self._cleanup_worker(worker))
-        worker.error.connect(lambda _: self._cleanup_worker(worker))
-        self._workers.append(worker)
-        worker.start()
+    def update_charts(self, data):
+        dist = data.get("equipment_type_distribution", {})
+        uploads = data.get("recent_uploads", [])
 
-    def load_chart_data(self):
-        try:
-            response = self.client.get_summary()
-            if response.status_code == 200:
-                data = response.json()
-                dist = data.get("equipment_type_distribution", {})
-                uploads = data.get("recent_uploads", [])
-                
-                # Update Distribution Charts
-                if hasattr(self, "bar_canvas"):
-                    self.bar_canvas.plot_equipment_distribution(dist)
-                if hasattr(self, "pie_canvas"):
-                    self.pie_canvas.plot_equipment_distribution(dist)
-                if hasattr(self, "doughnut_canvas"):
-                    self.doughnut_canvas.plot_equipment_distribution(dist)
-                
-                # Update Trend Chart
-                if hasattr(self, "trend_canvas"):
-                    self.trend_canvas.plot_upload_trends(uploads)
-                    
-                # Mini chart in summary
-                if hasattr(self, "mini_chart"):
-                    self.mini_chart.plot_equipment_distribution(dist)
-        except Exception as e:
-            print("Chart data error:", e)
+        # Update Distribution Charts
+        self.bar_canvas.plot_equipment_distribution(dist)
+        self.pie_canvas.plot_equipment_distribution(dist)
+        self.doughnut_canvas.plot_equipment_distribution(dist)
 
-    def load_history(self):
-        try:
-            response = self.client.get_history()
-            if response.status_code == 200:
-                data = response.json()
-                # Handle pagination (DRF default)
-                if isinstance(data, dict) and "results" in data:
-                    history = data["results"]
-                # Handle custom key
-                elif isinstance(data, dict) and "recent_uploads" in data:
-                    history = data["recent_uploads"]
-                # Handle flat list
-                elif isinstance(data, list):
-                    history = data
-                else:
-                    history = []
-                
-                self.update_history_table(history)
-        except Exception as e:
-            print("History load error:", e)
+        # Update Trend Chart
+        self.trend_canvas.plot_upload_trends(uploads)
 
-    def update_history_table(self, history):
-        table = self.history_table
-        table.setRowCount(0)
-        table.setSortingEnabled(False) # Disable sorting during update
-        
-        for row, item in enumerate(history):
-            table.insertRow(row)
-            
-            # Helper to create item
-            def make_item(text):
-                i = QTableWidgetItem(str(text))
-                i.setTextAlignment(Qt.AlignCenter)
-                return i
-                
-            table.setItem(row, 0, make_item(item.get("filename", "")))
-            table.setItem(row, 1, make_item(item.get("total_records", "")))
-            table.setItem(row, 2, make_item(f"{item.get('avg_flowrate', 0):.2f}"))
-            table.setItem(row, 3, make_item(f"{item.get('avg_pressure', 0):.2f}"))
-            table.setItem(row, 4, make_item(f"{item.get('avg_temperature', 0):.2f}"))
-            
-            # Action cell
-            container = QWidget()
-            l = QHBoxLayout(container)
-            l.setContentsMargins(4, 4, 4, 4)
-            l.setAlignment(Qt.AlignCenter)
-            
-            # High visibility styling for button
-            btn = QPushButton("PDF")
-            btn.setFixedSize(60, 30) 
-            btn.setCursor(Qt.PointingHandCursor)
-            # Use Primary Accent Color (Indigo) for button background, White text
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #6366f1; 
-                    color: white; 
-                    border: none;
-                    border-radius: 6px;
-                    font-weight: bold;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #4f46e5;
-                }
-            """)
-            btn.clicked.connect(lambda _, upload_id=item.get("id"): self.generate_pdf(upload_id))
-            
-            l.addWidget(btn)
-            table.setCellWidget(row, 5, container)
-            table.setRowHeight(row, 60)
-            
-        table.setSortingEnabled(True) # Re-enable sorting
+        # Mini chart in summary
+        self.mini_chart.plot_equipment_distribution(dist)
+
+    def update_history_table(self, history, next_url):
+        self.history_model.set_first_page(history, next_url)
 
     def filter_history(self, text):
-        search_text = text.lower()
-        for row in range(self.history_table.rowCount()):
-            item = self.history_table.item(row, 0) # Filename is column 0
-            if not item:
-                continue
-            
-            visible = search_text in item.text().lower()
-            self.history_table.setRowHidden(row, not visible)
+        self.history_proxy.setFilterFixedString(text)
 
     def _cleanup_worker(self, worker):
         if worker in self._workers:
@@ -649,7 +582,11 @@ class MainWindow(QMainWindow):
                 QMessageBox.information(self, "Success", "File uploaded successfully!")
 
     def closeEvent(self, event):
+        self.refresher.stop()
+        self.mini_chart.stop()
+        self.history_model.stop()
         for worker in self._workers[:]:
+            worker.requestInterruption()
             worker.quit()
             worker.wait()
         self._workers.clear()
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import requests
+
+
+def _config_dir():
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'chemical-equipment-visualizer')
+
+
+CACHE_ENABLED = os.environ.get('CEV_CACHE_ENABLED', '1') == '1'
+CACHE_PATH = os.environ.get('CEV_CACHE_PATH') or os.path.join(_config_dir(), 'cache.sqlite3')
+
+# Entries older than MAX_AGE seconds are dropped; beyond MAX_BYTES the
+# oldest entries go first
+CACHE_MAX_AGE = int(os.environ.get('CEV_CACHE_MAX_AGE', 7 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get('CEV_CACHE_MAX_BYTES', 20 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    user TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (user, url)
+);
+CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at);
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+class ResponseCache:
+    """On-disk cache of the last ETag-tagged API responses for one user.
+
+    Lets the window paint the previous session's summary, history and
+    charts before the backend answers, and lets APIClient revalidate them
+    with If-None-Match. Safe to use from any thread: each call opens its
+    own short-lived SQLite connection.
+    """
+
+    def __init__(self, user, path=None, max_age=None, max_bytes=None):
+        self.user = user
+        self.path = path or CACHE_PATH
+        self.max_age = CACHE_MAX_AGE if max_age is None else max_age
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def _connect(self):
+        # The config directory does not exist yet on a fresh install, and
+        # sqlite3 cannot create a database file in a missing directory
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        with _schema_lock:
+            if self.path not in _schema_ready:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.executescript(_SCHEMA)
+                _schema_ready.add(self.path)
+        return connection
+
+    def get(self, url):
+        """Return (etag, body) for a URL, or None when missing or expired."""
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    'SELECT etag, body FROM responses WHERE user = ? AND url = ? AND stored_at >= ?',
+                    (self.user, url, time.time() - self.max_age),
+                ).fetchone()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as exc:
+            print("Offline cache error:", exc)
+            return None
+        return (row[0], bytes(row[1])) if row else None
+
+    def get_json(self, url):
+        entry = self.get(url)
+        if entry is None:
+            return None
+        try:
+            return json.loads(entry[1])
+        except ValueError:
+            return None
+
+    def get_response(self, url):
+        """Return a cached entry as a 200 requests.Response, for revalidation."""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        etag, body = entry
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['ETag'] = etag
+        response.headers['Content-Type'] = 'application/json'
+        response._content = body
+        return response
+
+    def put(self, url, etag, body):
+        """Store a response body, then evict by age and total size."""
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        'INSERT OR REPLACE INTO responses (user, url, etag, body, size, stored_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (self.user, url, etag, body, len(body), time.time()),
+                    )
+                    self._evict(connection)
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as exc:
+            print("Offline cache error:", exc)
+
+    def touch(self, url):
+        """Mark an entry as fresh after the server confirmed it (304)."""
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        'UPDATE responses SET stored_at = ? WHERE user = ? AND url = ?',
+                        (time.time(), self.user, url),
+                    )
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as exc:
+            print("Offline cache error:", exc)
+
+    def _evict(self, connection):
+        connection.execute('DELETE FROM responses WHERE stored_at < ?', (time.time() - self.max_age,))
+
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute('SELECT rowid, size FROM responses ORDER BY stored_at').fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        connection.executemany('DELETE FROM responses WHERE rowid = ?', doomed)
+
+
+def get_response_cache(user):
+    """Return the offline cache for a username, or None when disabled."""
+    if not CACHE_ENABLED or not user:
+        return None
+    return ResponseCache(user)
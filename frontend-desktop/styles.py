@@ -47,7 +47,7 @@ QLineEdit:focus {
     border: 1px solid #6366f1;
 }
 QLabel { color: #0f172a; }
-QTableWidget {
+QTableView {
     background-color: #ffffff;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
@@ -217,7 +217,7 @@ QTabWidget::pane {
 }
 
 /* ================= Tables ================= */
-QTableWidget {
+QTableView {
     background-color: #1e293b;
     alternate-background-color: #0f172a; /* Striped effect */
     border: 1px solid #334155;
@@ -226,12 +226,12 @@ QTableWidget {
     color: #e2e8f0;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 12px;
     border-bottom: 1px solid #334155;
 }
 
-QTableWidget::item:selected {
+QTableView::item:selected {
     background-color: rgba(99, 102, 241, 0.2);
     color: #e0e7ff;
 }
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from offline_cache import ResponseCache
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Config directory that does not exist yet, as on a fresh install
+        self.path = os.path.join(self.tmp.name, 'config', 'chemical-equipment-visualizer', 'cache.sqlite3')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_put_creates_missing_directory(self):
+        cache = ResponseCache('alice', path=self.path)
+
+        cache.put('http://api/summary/', '"v1"', b'{"total_count": 3}')
+
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(cache.get('http://api/summary/'), ('"v1"', b'{"total_count": 3}'))
+        self.assertEqual(cache.get_json('http://api/summary/'), {'total_count': 3})
+
+    def test_get_on_missing_directory_is_a_miss(self):
+        self.assertIsNone(ResponseCache('alice', path=self.path).get('http://api/summary/'))
+
+    def test_entries_are_per_user(self):
+        ResponseCache('alice', path=self.path).put('http://api/summary/', '"v1"', b'{}')
+
+        self.assertIsNone(ResponseCache('bob', path=self.path).get('http://api/summary/'))
+
+    def test_get_response_revalidates_with_etag(self):
+        cache = ResponseCache('alice', path=self.path)
+        cache.put('http://api/history/', '"v2"', b'{"results": []}')
+
+        response = cache.get_response('http://api/history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['ETag'], '"v2"')
+        self.assertEqual(response.json(), {'results': []})
+
+    def test_evicts_oldest_entries_over_size_limit(self):
+        cache = ResponseCache('alice', path=self.path, max_bytes=2500)
+        for i in range(5):
+            cache.put(f'http://api/{i}/', '"v"', b'x' * 1000)
+
+        self.assertIsNone(cache.get('http://api/0/'))
+        self.assertIsNone(cache.get('http://api/2/'))
+        self.assertIsNotNone(cache.get('http://api/3/'))
+        self.assertIsNotNone(cache.get('http://api/4/'))
+
+    def test_expired_entries_are_ignored_and_evicted(self):
+        cache = ResponseCache('alice', path=self.path, max_age=60)
+        cache.put('http://api/old/', '"v"', b'{}')
+        with sqlite3.connect(self.path) as connection:
+            connection.execute('UPDATE responses SET stored_at = stored_at - 120')
+
+        self.assertIsNone(cache.get('http://api/old/'))
+
+        cache.put('http://api/new/', '"v"', b'{}')
+        with sqlite3.connect(self.path) as connection:
+            urls = [row[0] for row in connection.execute('SELECT url FROM responses')]
+        self.assertEqual(urls, ['http://api/new/'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+import workers
+from workers import RefreshCoordinator
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class SlowClient:
+    """API client that answers summary and history after LATENCY seconds"""
+
+    LATENCY = 0.5
+    calls = 0
+    lock = threading.Lock()
+
+    def __init__(self, token, cache=None):
+        pass
+
+    def get_summary_and_history(self):
+        with self.lock:
+            SlowClient.calls += 1
+            version = SlowClient.calls
+        time.sleep(self.LATENCY)
+        uploads = [{'id': i, 'filename': f'plant-{version}-{i}.csv'} for i in range(50)]
+        return StubResponse({'total_count': version}), StubResponse({'results': uploads, 'next': None})
+
+
+class RefreshCoordinatorTests(unittest.TestCase):
+    # Longest the GUI thread may go without processing events
+    MAX_BLOCK_MS = 50
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        SlowClient.calls = 0
+        patcher = mock.patch.object(workers, 'APIClient', SlowClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_loop(self, ms):
+        loop = QEventLoop()
+        QTimer.singleShot(ms, loop.quit)
+        loop.exec_()
+
+    def test_refresh_burst_never_blocks_event_loop(self):
+        coordinator = RefreshCoordinator('token')
+        summaries = []
+        coordinator.summary_loaded.connect(summaries.append)
+
+        gaps = []
+        last = [time.perf_counter()]
+
+        def beat():
+            now = time.perf_counter()
+            gaps.append(now - last[0])
+            last[0] = now
+
+        heartbeat = QTimer()
+        heartbeat.timeout.connect(beat)
+        heartbeat.start(5)
+
+        # A burst of triggers, then more while its refresh (about
+        # 1200-1700 ms) is in flight
+        for delay in range(0, 1000, 20):
+            QTimer.singleShot(delay, coordinator.request_refresh)
+        QTimer.singleShot(1250, coordinator.request_refresh)
+        QTimer.singleShot(1300, coordinator.request_refresh)
+        self.run_loop(2600)
+
+        heartbeat.stop()
+        coordinator.stop()
+
+        self.assertLess(max(gaps) * 1000, self.MAX_BLOCK_MS)
+        # Each burst is merged; the in-flight trigger queues one follow-up
+        self.assertEqual(SlowClient.calls, 2)
+        self.assertEqual(summaries, [{'total_count': 1}, {'total_count': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from PyQt5.QtCore import QCoreApplication
+
+import workers
+from workers import UploadWorker
+
+
+class StubResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class NeverFinishingClient:
+    """API client whose upload job stays running forever"""
+
+    def __init__(self, token, cache=None):
+        pass
+
+    def create_upload_job(self, file_path):
+        return StubResponse(202, {'id': 1, 'status': 'pending', 'progress': 0})
+
+    def get_upload_job(self, job_id):
+        return StubResponse(200, {'id': job_id, 'status': 'running', 'progress': 10})
+
+
+class UploadWorkerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        patcher = mock.patch.object(workers, 'APIClient', NeverFinishingClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_interruption_stops_polling(self):
+        worker = UploadWorker('plant.csv', 'token')
+        worker.start()
+        worker.msleep(200)
+
+        worker.requestInterruption()
+        worker.quit()
+
+        self.assertTrue(worker.wait(1000))
+
+    def test_polling_gives_up_after_timeout(self):
+        worker = UploadWorker('plant.csv', 'token')
+        worker.POLL_TIMEOUT_S = 0.3
+        errors = []
+        worker.error.connect(errors.append)
+
+        worker.start()
+        self.assertTrue(worker.wait(3000))
+        QCoreApplication.processEvents()
+
+        self.assertEqual(errors, ['Timed out waiting for the upload to be processed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,28 @@
-from PyQt5.QtCore import QThread, pyqtSignal
+import time
 
-from api import APIClient
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from api import HISTORY_URL, SUMMARY_URL, APIClient
 
 
 class UploadWorker(QThread):
-    """Worker thread for file upload."""
+    """Worker thread for file upload.
+
+    The file is queued as a background upload job on the server and the
+    job is polled until it finishes, reporting progress as a percentage.
+    Polling gives up after POLL_TIMEOUT_S, and stops as soon as
+    requestInterruption() is called (e.g. when the window closes).
+    """
 
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
+    progress = pyqtSignal(int)
+
+    POLL_INTERVAL_MS = 500
+    POLL_TIMEOUT_S = 30 * 60
+    # Granularity at which a sleeping poll notices an interruption request
+    INTERRUPT_CHECK_MS = 50
 
     def __init__(self, file_path, token):
         super().__init__()
@@ -17,32 +32,205 @@ class UploadWorker(QThread):
     def run(self):
         try:
             client = APIClient(self.token)
-            response = client.upload_csv(self.file_path)
-            if response.status_code == 201:
-                self.finished.emit(response.json())
-            else:
+            response = client.create_upload_job(self.file_path)
+            if response.status_code != 202:
                 self.error.emit(response.json().get('error', 'Upload failed'))
+                return
+
+            job = response.json()
+            deadline = time.monotonic() + self.POLL_TIMEOUT_S
+            while not self.isInterruptionRequested():
+                self.progress.emit(job.get('progress', 0))
+                if job['status'] == 'completed':
+                    self.finished.emit(job.get('upload') or {})
+                    return
+                if job['status'] == 'failed':
+                    self.error.emit(job.get('error') or 'Upload failed')
+                    return
+                if time.monotonic() >= deadline:
+                    self.error.emit('Timed out waiting for the upload to be processed')
+                    return
+
+                if not self._sleep(self.POLL_INTERVAL_MS):
+                    return
+                response = client.get_upload_job(job['id'])
+                if response.status_code != 200:
+                    self.error.emit('Failed to fetch upload status')
+                    return
+                job = response.json()
         except Exception as exc:  # pragma: no cover - UI thread boundary
             self.error.emit(str(exc))
 
+    def _sleep(self, ms):
+        """Sleep for ms, returning False early if interruption is requested."""
+        for _ in range(max(1, ms // self.INTERRUPT_CHECK_MS)):
+            if self.isInterruptionRequested():
+                return False
+            self.msleep(self.INTERRUPT_CHECK_MS)
+        return not self.isInterruptionRequested()
 
-class SummaryWorker(QThread):
-    """Worker thread for fetching summary."""
 
-    finished = pyqtSignal(dict)
+def history_page(data):
+    """Return (uploads, next page URL or '') from a /history/ response body."""
+    # Handle pagination (DRF default)
+    if isinstance(data, dict) and "results" in data:
+        return data["results"], data.get("next") or ""
+    # Handle custom key
+    if isinstance(data, dict) and "recent_uploads" in data:
+        return data["recent_uploads"], ""
+    # Handle flat list
+    if isinstance(data, list):
+        return data, ""
+    return [], ""
+
+
+class RefreshWorker(QThread):
+    """Worker thread fetching summary and history, in parallel, once each."""
+
+    finished = pyqtSignal(dict, list, str)
     error = pyqtSignal(str)
 
-    def __init__(self, token):
+    def __init__(self, token, cache=None):
         super().__init__()
         self.token = token
+        self.cache = cache
 
     def run(self):
         try:
-            client = APIClient(self.token)
-            response = client.get_summary()
-            if response.status_code == 200:
-                self.finished.emit(response.json())
-            else:
-                self.error.emit('Failed to fetch summary')
+            summary, history = APIClient(self.token, cache=self.cache).get_summary_and_history()
+            if summary.status_code != 200 or history.status_code != 200:
+                self.error.emit('Failed to refresh data')
+                return
+            self.finished.emit(summary.json(), *history_page(history.json()))
+        except Exception as exc:  # pragma: no cover - UI thread boundary
+            self.error.emit(str(exc))
+
+
+class HistoryPageWorker(QThread):
+    """Worker thread fetching one further page of upload history."""
+
+    finished = pyqtSignal(list, str)
+    error = pyqtSignal(str)
+
+    def __init__(self, token, url, cache=None):
+        super().__init__()
+        self.token = token
+        self.url = url
+        self.cache = cache
+
+    def run(self):
+        try:
+            response = APIClient(self.token, cache=self.cache).get_history(self.url)
+            if response.status_code != 200:
+                self.error.emit('Failed to fetch history')
+                return
+            self.finished.emit(*history_page(response.json()))
+        except Exception as exc:  # pragma: no cover - UI thread boundary
+            self.error.emit(str(exc))
+
+
+class RefreshCoordinator(QObject):
+    """Single entry point for reloading dashboard data off the GUI thread.
+
+    Triggers within DEBOUNCE_MS of each other are merged into one refresh,
+    and triggers that arrive while a refresh is in flight schedule exactly
+    one follow-up refresh instead of a parallel one. Results are fanned
+    out through the summary_loaded and history_loaded signals, and only
+    when they differ from what was last shown.
+
+    With an offline cache, load_cached() shows the previous session's data
+    straight away; the next refresh then revalidates it with the server.
+    """
+
+    summary_loaded = pyqtSignal(dict)
+    history_loaded = pyqtSignal(list, str)
+    error = pyqtSignal(str)
+
+    DEBOUNCE_MS = 200
+
+    def __init__(self, token, parent=None, cache=None):
+        super().__init__(parent)
+        self.token = token
+        self.cache = cache
+        self._worker = None
+        self._pending = False
+        self._shown = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start)
+
+    def load_cached(self):
+        """Emit cached summary and history, if any; returns whether it did."""
+        if self.cache is None:
+            return False
+        summary = self.cache.get_json(SUMMARY_URL)
+        history = self.cache.get_json(HISTORY_URL)
+        if not isinstance(summary, dict) or history is None:
+            return False
+        self._show(summary, *history_page(history))
+        return True
+
+    def request_refresh(self):
+        """Schedule a refresh; repeated calls restart the debounce window."""
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._pending = False
+        if self._worker is not None:
+            self._worker.wait()
+
+    def _start(self):
+        if self._worker is not None:
+            self._pending = True
+            return
+
+        worker = RefreshWorker(self.token, self.cache)
+        worker.finished.connect(self._on_finished)
+        worker.error.connect(self._on_error)
+        self._worker = worker
+        worker.start()
+
+    def _on_finished(self, summary, history, next_url):
+        self._show(summary, history, next_url)
+        self._on_done()
+
+    def _show(self, summary, history, next_url):
+        # An unchanged summary and first page means nothing changed (e.g. a
+        # 304 after load_cached()); skip it so the history view keeps its pages
+        if self._shown == (summary, history, next_url):
+            return
+        self._shown = (summary, history, next_url)
+        self.summary_loaded.emit(summary)
+        self.history_loaded.emit(history, next_url)
+
+    def _on_error(self, message):
+        self.error.emit(message)
+        self._on_done()
+
+    def _on_done(self):
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.wait()
+        if self._pending:
+            self._pending = False
+            self._start()
+
+
+class ChartRenderWorker(QThread):
+    """Worker thread running a chart render function that returns a QImage."""
+
+    finished = pyqtSignal(QImage)
+    error = pyqtSignal(str)
+
+    def __init__(self, render):
+        super().__init__()
+        self.render = render
+
+    def run(self):
+        try:
+            self.finished.emit(self.render())
         except Exception as exc:  # pragma: no cover - UI thread boundary
             self.error.emit(str(exc))
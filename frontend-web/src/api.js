@@ -31,8 +31,8 @@ export const authAPI = {
 };
 
 export const equipmentAPI = {
-    getAll: () =>
-        api.get('/equipment/'),
+    getAll: (params = {}) =>
+        api.get('/equipment/', { params }),
     uploadCSV: (file) => {
         const formData = new FormData();
         formData.append('file', file);
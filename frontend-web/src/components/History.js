@@ -62,8 +62,8 @@ function History({ history, onGeneratePDF }) {
     setViewingData(upload);
     setLoadingModal(true);
     try {
-      // Fetch all equipment for this user (filtered by backend)
-      const response = await equipmentAPI.getAll();
+      // Fetch equipment for this upload (filtered by backend)
+      const response = await equipmentAPI.getAll({ upload: upload.id });
 
       // Handle both array and paginated response formats
       const equipmentData = Array.isArray(response.data)